@@ -1,15 +1,35 @@
-from mcp_sql_agent.app.application.sql_agent_service import SqlAgentService
-from mcp_sql_agent.app.infrastructure.config import get_settings
-from mcp_sql_agent.app.infrastructure.db_context import DbContext
-from mcp_sql_agent.app.infrastructure.llm.translator import OpenAiTranslator
+from typing import TYPE_CHECKING
 
+if TYPE_CHECKING:
+    from mcp_sql_agent.app.infrastructure.config import Settings
+    from mcp_sql_agent.app.infrastructure.llm.translator import OpenAiTranslator
+    from mcp_sql_agent.app.application.sql_agent_service import SqlAgentService
 
-def build_sql_agent_service() -> SqlAgentService:
+
+def build_sql_agent_service() -> "SqlAgentService":
     """Compose and return the application service with configured providers."""
-    # Composition root: wire infrastructure to application once.
+    # Composition root: wire infrastructure to application once. Imports are
+    # deferred so importing the MCP tool module does not load SQLAlchemy.
+    from mcp_sql_agent.app.application.sql_agent_service import SqlAgentService
+    from mcp_sql_agent.app.infrastructure.config import get_settings
+    from mcp_sql_agent.app.infrastructure.db_context import DbContext
+
     settings = get_settings()
     context = DbContext(settings.db_url)
     return SqlAgentService(
         context,
-        lambda: OpenAiTranslator(settings.openai_api_key, settings.openai_model),
+        lambda: _build_translator(settings),
+    )
+
+
+def _build_translator(settings: "Settings") -> "OpenAiTranslator":
+    """Import and construct the OpenAI translator on first translation."""
+    from mcp_sql_agent.app.infrastructure.llm.translator import OpenAiTranslator
+
+    return OpenAiTranslator(
+        settings.openai_api_key,
+        settings.openai_model,
+        max_concurrency=settings.openai_max_concurrency,
+        rpm_limit=settings.openai_rpm_limit,
+        tpm_limit=settings.openai_tpm_limit,
     )
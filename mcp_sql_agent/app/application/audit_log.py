@@ -1,31 +1,164 @@
-import json
+import atexit
+import logging
 import os
+import queue
+import threading
+import time
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
 
-import aiofiles
+from mcp_sql_agent.app.application.json_codec import dumps_bytes
 
 
+logger = logging.getLogger(__name__)
+
+_MAX_BATCH = 256  # stays below IOV_MAX (1024 on Linux) for a single writev
+# Backlog cap: if the disk stalls, events beyond this are dropped and counted
+# rather than growing memory without bound.
+_MAX_QUEUED = 10_000
+_OPEN_FLAGS = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_CLOEXEC", 0)
+
+# Items are encoded JSONL lines (bytes), or threading.Event markers used by flush().
+_q: queue.Queue = queue.Queue(maxsize=_MAX_QUEUED)
+_writer_thread: threading.Thread | None = None
+_writer_lock = threading.Lock()
+_dropped = 0
+
+
+@lru_cache(maxsize=1)
 def _default_log_path() -> Path:
     """Return the default audit log location within the application root."""
     root = Path(__file__).resolve().parents[1]
     return root / "audit.log.jsonl"
 
 
-async def write_event(event: dict) -> None:
-    """Append a JSONL audit event to disk.
+@lru_cache(maxsize=8)
+def _resolve_log_path(override: str | None) -> Path:
+    """Map an AUDIT_LOG_PATH value (or None) to the log file path."""
+    return Path(override) if override else _default_log_path()
+
+
+def _log_path() -> Path:
+    """Return the audit log path, honoring the AUDIT_LOG_PATH override."""
+    # Checked per batch so the override can change at runtime; the Path and the
+    # default's resolve() (which stats the filesystem) are computed once.
+    return _resolve_log_path(os.getenv("AUDIT_LOG_PATH"))
+
+
+def _write_all(fd: int, lines: list[bytes]) -> None:
+    """Append lines to fd with as few syscalls as possible (one writev per batch)."""
+    if hasattr(os, "writev"):
+        written = os.writev(fd, lines)
+        total = sum(len(line) for line in lines)
+        if written == total:
+            return
+        data = memoryview(b"".join(lines))[written:]
+    else:  # pragma: no cover - non-POSIX platforms
+        data = memoryview(b"".join(lines))
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def _writer_main() -> None:
+    """Drain the queue in batches into the audit log (writer thread body)."""
+    fd: int | None = None
+    fd_path: Path | None = None
+    while True:
+        batch = [_q.get()]
+        while len(batch) < _MAX_BATCH:
+            try:
+                batch.append(_q.get_nowait())
+            except queue.Empty:
+                break
+
+        lines = [b for b in batch if isinstance(b, bytes)]
+        waiters = [b for b in batch if isinstance(b, threading.Event)]
+        try:
+            if lines:
+                path = _log_path()
+                if path != fd_path:
+                    if fd is not None:
+                        os.close(fd)
+                        fd, fd_path = None, None
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    fd = os.open(path, _OPEN_FLAGS, 0o644)
+                    fd_path = path
+                # Unbuffered: each batch reaches the kernel in one call, so
+                # there is no user-space buffer to flush on a timer.
+                _write_all(fd, lines)
+        except OSError:
+            logger.exception("audit log write failed")
+        for waiter in waiters:
+            waiter.set()
+
+
+def _ensure_writer() -> None:
+    """Start the writer thread once per process."""
+    global _writer_thread
+    if _writer_thread is not None:
+        return
+    with _writer_lock:
+        if _writer_thread is None:
+            thread = threading.Thread(
+                target=_writer_main, name="audit-log-writer", daemon=True
+            )
+            thread.start()
+            _writer_thread = thread
+
+
+def write_event(event: dict) -> None:
+    """Queue a JSONL audit event for the background writer thread.
+
+    Never blocks on I/O, so it is safe to call from sync code and from
+    inside a running event loop alike. When the backlog is full the event
+    is dropped and counted (see dropped_events).
 
     Args:
         event: Event payload to write. Timestamp is injected automatically.
     Side Effects:
-        Creates parent directories when missing and writes to the audit log.
+        Starts the writer thread on first use; the writer creates parent
+        directories when missing and appends batched events to the audit log.
     """
-    path = Path(os.getenv("AUDIT_LOG_PATH", str(_default_log_path())))
+    global _dropped
     payload = {
         "ts": datetime.now(timezone.utc).isoformat(),
         **event,
     }
+    _ensure_writer()
+    # Serialize now so later mutations of the caller's dicts are not logged.
+    try:
+        _q.put_nowait(dumps_bytes(payload) + b"\n")
+    except queue.Full:
+        with _writer_lock:
+            _dropped += 1
+
+
+def dropped_events() -> int:
+    """Return how many audit events were dropped because the backlog was full."""
+    return _dropped
+
+
+def flush(timeout: float | None = 5.0) -> bool:
+    """Block until events queued so far have been written to the audit log.
+
+    Args:
+        timeout: Max seconds to wait, or None to wait indefinitely.
+    Returns:
+        True when the writer confirmed the flush before the timeout.
+    """
+    if _writer_thread is None:
+        return True
+    done = threading.Event()
+    start = time.monotonic()
+    try:
+        # Bounded too: with a stalled writer the backlog can stay full.
+        _q.put(done, timeout=timeout)
+    except queue.Full:
+        return False
+    if timeout is not None:
+        timeout = max(0.0, timeout - (time.monotonic() - start))
+    return done.wait(timeout)
+
 
-    path.parent.mkdir(parents=True, exist_ok=True)
-    async with aiofiles.open(path, "a", encoding="utf-8") as handle:
-        await handle.write(json.dumps(payload, ensure_ascii=True) + "\n")
+atexit.register(flush)
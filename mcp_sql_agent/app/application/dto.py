@@ -8,7 +8,28 @@ def _assert(condition: bool, message: str) -> None:
         raise ValueError(message)
 
 
-@dataclass(frozen=True)
+# (field, accepted types, description) checked by _validate_plan, in order.
+_PLAN_FIELD_TYPES: tuple[tuple[str, type | tuple[type, ...], str], ...] = (
+    ("explain", dict, "a dict"),
+    ("risk_score", (int, float), "numeric"),
+    ("risky_reasons", list, "a list"),
+    ("improvements", list, "a list"),
+    ("plan_json", dict, "a dict"),
+    ("safe_sql", str, "a string"),
+    ("notes", list, "a list"),
+)
+
+
+def _validate_plan(data: dict) -> None:
+    """Raise ValueError naming the first plan field with an unexpected type."""
+    get = data.get
+    for field, types, expected in _PLAN_FIELD_TYPES:
+        if not isinstance(get(field), types):
+            raise ValueError(f"plan.{field} must be {expected}")
+
+
+# slots=True drops the per-instance __dict__ (smaller, faster attribute access).
+@dataclass(frozen=True, slots=True)
 class QueryPlanDto:
     """Typed representation of a query plan with risk and safety metadata."""
     explain: dict
@@ -17,22 +38,16 @@ class QueryPlanDto:
     total_cost: float | None
     risk_score: float
     risk_level: str | None
-    risky_reasons: list[str]
-    improvements: list[str]
+    risky_reasons: tuple[str, ...]
+    improvements: tuple[str, ...]
     plan_json: dict
     safe_sql: str
-    notes: list[str]
+    notes: tuple[str, ...]
 
     @classmethod
     def from_dict(cls, data: dict) -> "QueryPlanDto":
         """Validate and build a QueryPlanDto from a plain dict."""
-        _assert(isinstance(data.get("explain"), dict), "plan.explain must be a dict")
-        _assert(isinstance(data.get("risk_score"), (int, float)), "plan.risk_score must be numeric")
-        _assert(isinstance(data.get("risky_reasons"), list), "plan.risky_reasons must be a list")
-        _assert(isinstance(data.get("improvements"), list), "plan.improvements must be a list")
-        _assert(isinstance(data.get("plan_json"), dict), "plan.plan_json must be a dict")
-        _assert(isinstance(data.get("safe_sql"), str), "plan.safe_sql must be a string")
-        _assert(isinstance(data.get("notes"), list), "plan.notes must be a list")
+        _validate_plan(data)
         return cls(
             explain=data["explain"],
             estimate_ms=data.get("estimate_ms"),
@@ -40,11 +55,33 @@ class QueryPlanDto:
             total_cost=data.get("total_cost"),
             risk_score=float(data["risk_score"]),
             risk_level=data.get("risk_level"),
-            risky_reasons=list(data["risky_reasons"]),
-            improvements=list(data["improvements"]),
+            risky_reasons=tuple(data["risky_reasons"]),
+            improvements=tuple(data["improvements"]),
             plan_json=data["plan_json"],
             safe_sql=str(data["safe_sql"]),
-            notes=list(data["notes"]),
+            notes=tuple(data["notes"]),
+        )
+
+    @classmethod
+    def from_trusted_dict(cls, data: dict) -> "QueryPlanDto":
+        """Build a QueryPlanDto from a plan produced by internal code.
+
+        Skips validation. Plans may be shared through PlanCache, so list
+        fields are still snapshotted into tuples rather than aliased.
+        Use from_dict for anything that did not come from build_query_plan.
+        """
+        return cls(
+            explain=data["explain"],
+            estimate_ms=data.get("estimate_ms"),
+            plan_rows=data.get("plan_rows"),
+            total_cost=data.get("total_cost"),
+            risk_score=data["risk_score"],
+            risk_level=data.get("risk_level"),
+            risky_reasons=tuple(data["risky_reasons"]),
+            improvements=tuple(data["improvements"]),
+            plan_json=data["plan_json"],
+            safe_sql=data["safe_sql"],
+            notes=tuple(data["notes"]),
         )
 
     def to_dict(self) -> dict:
@@ -56,15 +93,15 @@ class QueryPlanDto:
             "total_cost": self.total_cost,
             "risk_score": self.risk_score,
             "risk_level": self.risk_level,
-            "risky_reasons": self.risky_reasons,
-            "improvements": self.improvements,
+            "risky_reasons": list(self.risky_reasons),
+            "improvements": list(self.improvements),
             "plan_json": self.plan_json,
             "safe_sql": self.safe_sql,
-            "notes": self.notes,
+            "notes": list(self.notes),
         }
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SqlResultDto:
     """Typed representation of a SELECT result with plan metadata."""
     row_count: int
@@ -81,7 +118,8 @@ class SqlResultDto:
         _assert(isinstance(row_count, int), "row_count must be int")
         _assert(isinstance(rows, list), "rows must be list")
         _assert(isinstance(executed_sql, str), "executed_sql must be string")
-        plan_dto = QueryPlanDto.from_dict(plan)
+        # Plans reaching here come from build_query_plan, which already validated them.
+        plan_dto = QueryPlanDto.from_trusted_dict(plan)
         return cls(row_count=row_count, rows=rows, executed_sql=executed_sql, plan=plan_dto, table=table)
 
     def to_dict(self) -> dict:
@@ -97,7 +135,7 @@ class SqlResultDto:
         return data
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SqlWriteResultDto:
     """Typed representation of a write result with affected row count."""
     row_count: int
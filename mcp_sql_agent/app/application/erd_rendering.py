@@ -1,33 +1,43 @@
+import io
 import re
+from functools import lru_cache
 
 
+_IDENT_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+
+@lru_cache(maxsize=4096)
 def _sanitize_identifier(value: str) -> str:
     """Normalize identifiers for Mermaid output by stripping unsafe characters."""
-    cleaned = re.sub(r"[^a-zA-Z0-9_]", "_", value or "")
-    return cleaned or "unknown"
+    # Memoized: type names and column names repeat heavily within a schema.
+    return _IDENT_RE.sub("_", value or "") or "unknown"
 
 
 def build_erd_mermaid(schema: dict) -> str:
     """Build a Mermaid ER diagram string from schema metadata."""
     tables = schema.get("tables", {})
     foreign_keys = schema.get("foreign_keys", [])
+    san = _sanitize_identifier
 
-    lines = ["erDiagram"]
+    # Stream straight into one buffer; no per-table lists or intermediate joins.
+    buf = io.StringIO()
+    write = buf.write
+    write("erDiagram")
     for table_name, columns in tables.items():
-        safe_table = _sanitize_identifier(str(table_name))
-        lines.append(f"  {safe_table} {{")
+        write("\n  ")
+        write(san(str(table_name)))
+        write(" {")
         for column in columns:
-            col_type = _sanitize_identifier(str(column.get("type", "")))
-            col_name = _sanitize_identifier(str(column.get("name", "")))
-            lines.append(f"    {col_type} {col_name}")
-        lines.append("  }")
-
+            write("\n    ")
+            write(san(str(column.get("type", ""))))
+            write(" ")
+            write(san(str(column.get("name", ""))))
+        write("\n  }")
     for fk in foreign_keys:
-        table = _sanitize_identifier(str(fk.get("table", "")))
-        ref_table = _sanitize_identifier(str(fk.get("referred_table", "")))
-        cols = ", ".join(_sanitize_identifier(c) for c in fk.get("columns", []))
-        label = cols or "fk"
-        if table and ref_table:
-            lines.append(f"  {ref_table} ||--o{{ {table} : \"{label}\"")
-
-    return "\n".join(lines)
+        table = san(str(fk.get("table", "")))
+        ref_table = san(str(fk.get("referred_table", "")))
+        if not table or not ref_table:
+            continue
+        label = ", ".join(san(c) for c in fk.get("columns", [])) or "fk"
+        write(f"\n  {ref_table} ||--o{{ {table} : \"{label}\"")
+    return buf.getvalue()
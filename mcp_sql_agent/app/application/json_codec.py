@@ -0,0 +1,32 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def dumps_bytes(obj: object, sort_keys: bool = False) -> bytes:
+    """Serialize obj to compact UTF-8 JSON bytes.
+
+    Uses orjson when installed (the "speedups" extra) and falls back to the
+    stdlib encoder otherwise. Values neither encoder supports natively (e.g.
+    Decimal, or dates on the stdlib path) are written as str(), matching how
+    the MCP transport renders tool results.
+    """
+    if orjson is not None:
+        option = _ORJSON_OPTIONS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option)
+    return json.dumps(
+        obj,
+        sort_keys=sort_keys,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    ).encode("utf-8")
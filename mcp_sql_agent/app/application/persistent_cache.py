@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from mcp_sql_agent.app.application.json_codec import dumps_bytes
+
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS cache ("
+    " key TEXT PRIMARY KEY, value TEXT NOT NULL, schema_fp TEXT, ts REAL NOT NULL)"
+)
+
+
+class PersistentStore:
+    """SQLite-backed copy of a QueryCache, so a restart starts warm.
+
+    Values are stored as JSON; timestamps are wall-clock so entry age
+    survives the process. Writes are synchronous, which is fine for the
+    translation cache: an entry is only written after an LLM round trip.
+    """
+    def __init__(self, path: Path) -> None:
+        """Open (creating if needed) the cache database at path.
+
+        Side Effects:
+            Creates parent directories and the database file; enables WAL.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+
+    def load(
+        self, limit: int, max_age: float | None
+    ) -> list[tuple[str, object, str | None, float]]:
+        """Return the newest entries and prune the rest from disk.
+
+        Args:
+            limit: Max entries to keep and return.
+            max_age: Entries older than this many seconds are dropped.
+        Returns:
+            List of (key, value, schema_fp, age_seconds), oldest first.
+        """
+        now = time.time()
+        if max_age is not None:
+            self._conn.execute("DELETE FROM cache WHERE ts < ?", (now - max_age,))
+        self._conn.execute(
+            "DELETE FROM cache WHERE key NOT IN"
+            " (SELECT key FROM cache ORDER BY ts DESC LIMIT ?)",
+            (limit,),
+        )
+        rows = self._conn.execute(
+            "SELECT key, value, schema_fp, ts FROM cache ORDER BY ts"
+        ).fetchall()
+        return [(key, json.loads(value), fp, now - ts) for key, value, fp, ts in rows]
+
+    def put(self, key: str, value: object, schema_fp: str | None) -> None:
+        """Insert or replace one entry."""
+        self._conn.execute(
+            "REPLACE INTO cache (key, value, schema_fp, ts) VALUES (?, ?, ?, ?)",
+            (key, dumps_bytes(value).decode("utf-8"), schema_fp, time.time()),
+        )
+
+    def delete_schema(self, schema_fp: str) -> None:
+        """Delete every entry built for schema_fp."""
+        self._conn.execute("DELETE FROM cache WHERE schema_fp = ?", (schema_fp,))
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        self._conn.execute("DELETE FROM cache")
+
+
+def store_from_env(var: str = "QUERY_CACHE_PATH") -> PersistentStore | None:
+    """Open the store named by an env var, or return None when unset or unusable.
+
+    Args:
+        var: Environment variable holding the cache database path.
+    Returns:
+        PersistentStore, or None to keep the cache in memory only.
+    """
+    path = os.getenv(var)
+    if not path:
+        return None
+    try:
+        return PersistentStore(Path(path))
+    except sqlite3.Error:
+        logger.exception("persistent cache unavailable: %s", path)
+        return None
@@ -0,0 +1,170 @@
+import asyncio
+import re
+from collections.abc import Awaitable, Callable
+
+from mcp_sql_agent.app.application.query_cache import QueryCache, schema_fingerprint
+from mcp_sql_agent.app.application.sql_planning import build_query_plan
+from mcp_sql_agent.app.domain.ports import SqlAdapter
+
+
+# Quoted identifiers are matched only so that digits inside them are skipped.
+_SQL_TOKEN_RE = re.compile(
+    r'"(?:[^"]|"")*"'
+    r"|(?P<literal>'(?:[^']|'')*'|(?<![\w.])\d+(?:\.\d+)?(?![\w.]))"
+)
+
+
+class PlanCache(QueryCache[dict]):
+    """LRU cache of read-query plans, bound to the schema they were built on.
+
+    EXPLAIN estimates drift as data changes, so entries also expire after a
+    shorter TTL than translations even when the schema is unchanged.
+    """
+    def __init__(self, ttl_seconds: float | None = 300, maxsize: int = 1024) -> None:
+        """Create a plan cache with a time-to-live in seconds and a max entry count."""
+        super().__init__(ttl_seconds=ttl_seconds, maxsize=maxsize)
+        # Plans currently being built, so concurrent misses share one build.
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def single_flight(
+        self, key: str, build: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """Run build for key unless a build for key is already in flight.
+
+        Concurrent callers with the same key await the first caller's result
+        (or exception) instead of building the plan again.
+
+        Args:
+            key: Plan cache key identifying the build.
+            build: Coroutine factory that builds the plan and caches it.
+        Returns:
+            Plan dict from this or the in-flight build.
+        """
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                # Shielded so a cancelled waiter does not cancel the build.
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The building task was cancelled; retry (and maybe build).
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await build()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited future does not log it again.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+
+
+def build_plan_cache_key(
+    sql: str,
+    safe_limit: int,
+    run_explain: bool,
+    db_url: str | None,
+    with_schema: bool = False,
+) -> str:
+    """Build the cache key for a plan request.
+
+    The SQL text is only stripped, not case- or whitespace-folded: the cached
+    plan carries safe_sql, which must be the caller's exact statement.
+    with_schema marks plans whose plan JSON includes schema join paths.
+    """
+    flags = ("e" if run_explain else "-") + ("s" if with_schema else "-")
+    return f"{db_url or ''}\x00{safe_limit}\x00{flags}\x00{sql.strip()}"
+
+
+async def cached_query_plan(
+    cache: PlanCache,
+    sql: str,
+    adapter: SqlAdapter,
+    db_url: str | None,
+    schema: dict,
+    safe_limit: int,
+    run_explain: bool = True,
+    with_schema: bool = False,
+) -> dict:
+    """Return the plan for sql, reusing one built against the same schema.
+
+    An exact repeat reuses the whole plan. A query differing only in
+    literals reuses the EXPLAIN result and rebuilds the text-based parts
+    (risk signals, plan JSON, safe SQL) from this query's own SQL.
+    Concurrent misses for the same key share a single build.
+
+    Args:
+        cache: Plan cache shared by the planning use cases.
+        sql: SQL statement to plan.
+        adapter: Adapter used for EXPLAIN on a miss.
+        db_url: Optional override for the default DB URL (cache scope).
+        schema: Current schema; entries built on an older one are dropped.
+        safe_limit: Max rows used for safety checks and planning.
+        run_explain: When False, the plan carries text-based signals only.
+        with_schema: When True, the plan JSON includes schema join paths.
+    Returns:
+        Plan dict, shared with the cache; callers must not mutate it.
+    """
+    schema_fp = schema_fingerprint(schema)
+    cache.invalidate_schema(db_url, schema_fp)
+    key = build_plan_cache_key(sql, safe_limit, run_explain, db_url, with_schema)
+    cached = cache.get(key, schema_fp)
+    if cached is not None:
+        return cached
+
+    async def _build() -> dict:
+        explain_key = None
+        explain = None
+        if run_explain:
+            template, literals = parameterize_sql(sql)
+            if literals:
+                explain_key = build_explain_cache_key(template, db_url)
+                explain = cache.get(explain_key, schema_fp)
+        plan = await build_query_plan(
+            sql,
+            adapter,
+            safe_limit=safe_limit,
+            schema=schema if with_schema else None,
+            run_explain=run_explain,
+            explain=explain,
+        )
+        if run_explain and "rows" not in plan["explain"]:
+            # EXPLAIN failed; serve this plan once but retry on the next call.
+            return plan
+        cache.set(key, plan, schema_fp)
+        if explain_key and explain is None:
+            cache.set(explain_key, plan["explain"], schema_fp)
+        return plan
+
+    return await cache.single_flight(key, _build)
+
+
+def parameterize_sql(sql: str) -> tuple[str, list[str]]:
+    """Replace string and numeric literals in SQL with ? tags.
+
+    Returns:
+        Tuple of (tagged SQL, literals in order of appearance).
+    """
+    literals: list[str] = []
+
+    def _tag(match: re.Match) -> str:
+        literal = match.group("literal")
+        if literal is None:
+            return match.group(0)
+        literals.append(literal)
+        return "?"
+
+    return _SQL_TOKEN_RE.sub(_tag, sql.strip()), literals
+
+
+def build_explain_cache_key(sql_template: str, db_url: str | None) -> str:
+    """Build the cache key for an EXPLAIN result shared across literal values."""
+    return f"explain\x00{db_url or ''}\x00{sql_template}"
@@ -1,33 +1,185 @@
 import hashlib
-import json
+import re
 import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Generic, TypeVar
 
+from mcp_sql_agent.app.application.json_codec import dumps_bytes
 
-class QueryCache:
-    """TTL-based in-memory cache for NL->SQL translations."""
-    def __init__(self, ttl_seconds: int = 300) -> None:
-        """Create a cache with a time-to-live in seconds."""
+if TYPE_CHECKING:
+    from mcp_sql_agent.app.application.persistent_cache import PersistentStore
+
+
+_NL_STRING_RE = re.compile(r"'[^']*'")
+_NL_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_NL_LITERAL_RE = re.compile(r"'[^']*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE_RE = re.compile(r"\s+")
+_SLOT_RE = re.compile(r"\x00(\d+)\x00")
+
+_V = TypeVar("_V")
+
+_SCHEMA_FP_CACHE_SIZE = 32
+# id(schema) -> (schema, fingerprint); holding the schema keeps its id stable.
+_schema_fps: OrderedDict[int, tuple[dict, str]] = OrderedDict()
+
+
+class QueryCache(Generic[_V]):
+    """Size-bounded LRU cache for NL->SQL translations, bound to schema versions.
+
+    Entries remember the schema fingerprint they were translated against and
+    are dropped when that schema changes, so the TTL is only a backstop.
+    With a PersistentStore attached, writes are mirrored to disk and the
+    newest entries are loaded back on construction.
+    """
+    def __init__(
+        self,
+        ttl_seconds: float | None = 3600,
+        maxsize: int = 1024,
+        disk: "PersistentStore | None" = None,
+    ) -> None:
+        """Create a cache with an optional TTL in seconds, max size, and disk copy."""
         self._ttl_seconds = ttl_seconds
-        self._store: dict[str, tuple[str, float]] = {}
+        self._maxsize = maxsize
+        self._store: OrderedDict[str, tuple[_V, str | None, float]] = OrderedDict()
+        # Latest schema fingerprint seen per scope (e.g. DB URL).
+        self._scope_fps: dict[str | None, str] = {}
+        self._disk = disk
+        if disk is not None:
+            now = time.monotonic()
+            for key, value, schema_fp, age in disk.load(maxsize, ttl_seconds):
+                self._store[key] = (value, schema_fp, now - age)
 
-    def get(self, key: str) -> str | None:
-        """Return cached value when fresh, otherwise None."""
+    def get(self, key: str, schema_fp: str | None = None) -> _V | None:
+        """Return cached value when fresh and built for schema_fp, otherwise None."""
         cached = self._store.get(key)
         if cached is None:
             return None
-        value, ts = cached
-        if time.time() - ts > self._ttl_seconds:
+        value, entry_fp, ts = cached
+        expired = (
+            self._ttl_seconds is not None
+            and time.monotonic() - ts > self._ttl_seconds
+        )
+        if expired or (schema_fp is not None and entry_fp != schema_fp):
             self._store.pop(key, None)
             return None
+        self._store.move_to_end(key)
         return value
 
-    def set(self, key: str, value: str) -> None:
-        """Store a value in the cache with the current timestamp."""
-        self._store[key] = (value, time.time())
+    def set(self, key: str, value: _V, schema_fp: str | None = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self._store[key] = (value, schema_fp, time.monotonic())
+        self._store.move_to_end(key)
+        if len(self._store) > self._maxsize:
+            self._store.popitem(last=False)
+        if self._disk is not None:
+            self._disk.put(key, value, schema_fp)
+
+    def invalidate_schema(self, scope: str | None, schema_fp: str) -> int:
+        """Record the current schema for a scope and drop entries built on its old one.
+
+        Args:
+            scope: Identifies the database the schema belongs to.
+            schema_fp: Fingerprint of the schema currently in use for scope.
+        Returns:
+            Number of entries dropped.
+        """
+        previous = self._scope_fps.get(scope)
+        self._scope_fps[scope] = schema_fp
+        if previous is None or previous == schema_fp:
+            return 0
+        stale = [key for key, entry in self._store.items() if entry[1] == previous]
+        for key in stale:
+            del self._store[key]
+        if self._disk is not None:
+            self._disk.delete_schema(previous)
+        return len(stale)
+
+    def clear(self) -> None:
+        """Drop every entry and forget the schema seen per scope."""
+        self._store.clear()
+        self._scope_fps.clear()
+        if self._disk is not None:
+            self._disk.clear()
+
+
+def _hash(data: bytes) -> str:
+    """Return a short hex digest for cache keys."""
+    # Not a security boundary: BLAKE2b is faster than SHA-256 and 128 bits is plenty.
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def schema_fingerprint(schema: dict) -> str:
+    """Return a content hash of the schema, memoized per schema object.
+
+    Schema dicts are treated as immutable once built, so repeated calls with
+    the same (cached) schema skip re-serializing it.
+    """
+    schema_id = id(schema)
+    cached = _schema_fps.get(schema_id)
+    if cached is not None and cached[0] is schema:
+        _schema_fps.move_to_end(schema_id)
+        return cached[1]
+    fingerprint = _hash(dumps_bytes(schema, sort_keys=True))
+    _schema_fps[schema_id] = (schema, fingerprint)
+    if len(_schema_fps) > _SCHEMA_FP_CACHE_SIZE:
+        _schema_fps.popitem(last=False)
+    return fingerprint
 
 
 def build_cache_key(nl_query: str, schema: dict) -> str:
     """Build a deterministic cache key from the request and schema."""
-    payload = {"nl_query": nl_query, "schema": schema}
-    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=True).encode("utf-8")
-    return hashlib.sha256(encoded).hexdigest()
+    return build_cache_key_fp(nl_query, schema_fingerprint(schema))
+
+
+def build_cache_key_fp(nl_query: str, schema_fp: str) -> str:
+    """Build a cache key from the request and an already computed schema fingerprint."""
+    return _hash(f"{schema_fp}:{nl_query}".encode("utf-8"))
+
+
+def normalize_nl_literals(nl_query: str) -> tuple[str, list[str]]:
+    """Replace quoted strings and numbers in a NL request with placeholders.
+
+    Returns:
+        Tuple of (template text, literals in order of appearance).
+    """
+    literals = _NL_LITERAL_RE.findall(nl_query)
+    template = _NL_STRING_RE.sub("'?'", nl_query)
+    template = _NL_NUMBER_RE.sub("?", template)
+    return _WHITESPACE_RE.sub(" ", template).strip(), literals
+
+
+def _literal_pattern(literal: str) -> re.Pattern:
+    """Return a pattern matching a NL literal as a standalone SQL token."""
+    if literal.startswith("'"):
+        return re.compile(re.escape(literal))
+    return re.compile(rf"(?<![\w.'\x00]){re.escape(literal)}(?![\w.'\x00])")
+
+
+def to_sql_template(sql: str, literals: list[str]) -> str | None:
+    """Swap NL literals in generated SQL for slots so the SQL can be reused.
+
+    Returns None when the mapping is ambiguous (a literal repeats or does not
+    appear exactly once in the SQL); such translations must not be shared
+    across requests with different literals.
+    """
+    if len(set(literals)) != len(literals):
+        return None
+    template = sql
+    for index, literal in enumerate(literals):
+        pattern = _literal_pattern(literal)
+        if len(pattern.findall(template)) != 1:
+            return None
+        template = pattern.sub(f"\x00{index}\x00", template)
+    return template
+
+
+def render_sql_template(template: str, literals: list[str]) -> str | None:
+    """Fill template slots with the request literals; None when they do not fit.
+
+    A template has exactly one slot per literal of the request it was built
+    from, so any other literal count means a different request shape.
+    """
+    slots = [int(i) for i in _SLOT_RE.findall(template)]
+    if len(slots) != len(literals):
+        return None
+    return _SLOT_RE.sub(lambda m: literals[int(m.group(1))], template)
@@ -1,6 +1,33 @@
 import re
 
-from mcp_sql_agent.app.application.sql_validation import has_limit
+from mcp_sql_agent.app.application.sql_validation import has_limit, normalize_sql
+
+
+_JOIN_RE = re.compile(r"\bjoin\b")
+_MAX_JOINS = 3
+
+
+def _count_joins(text: str, limit: int) -> int:
+    """Count JOIN keywords in lowered SQL, stopping once limit is reached."""
+    if "join" not in text:
+        return 0
+    count = 0
+    for _ in _JOIN_RE.finditer(text):
+        count += 1
+        if count >= limit:
+            break
+    return count
+
+
+def _has_where_word(text: str) -> bool:
+    """Return True when the stripped, lowered SQL contains a space-delimited "where"."""
+    # Same as `" where " in f" {text} "` without building the padded copy.
+    return (
+        " where " in text
+        or text.startswith("where ")
+        or text.endswith(" where")
+        or text == "where"
+    )
 
 
 def evaluate_policy(sql: str, plan: dict, read_only: bool = True) -> dict:
@@ -13,7 +40,7 @@ def evaluate_policy(sql: str, plan: dict, read_only: bool = True) -> dict:
     Returns:
         Dict with policy decision and suggested remediation.
     """
-    text = sql.strip().lower()
+    text = normalize_sql(sql)
     if read_only and not (text.startswith("select") or text.startswith("with")):
         return {
             "allowed": False,
@@ -30,8 +57,7 @@ def evaluate_policy(sql: str, plan: dict, read_only: bool = True) -> dict:
             "suggested_fix": "Send a single statement per request.",
         }
 
-    join_count = len(re.findall(r"\bjoin\b", text))
-    if join_count >= 3:
+    if _count_joins(text, _MAX_JOINS) >= _MAX_JOINS:
         return {
             "allowed": False,
             "policy": "JOIN_COMPLEXITY",
@@ -39,9 +65,9 @@ def evaluate_policy(sql: str, plan: dict, read_only: bool = True) -> dict:
             "suggested_fix": "Reduce joins or add filters and indexes.",
         }
 
-    if " where " not in f" {text} " and not has_limit(text):
+    if not _has_where_word(text) and not has_limit(text):
         safe_sql = plan.get("safe_sql", "")
-        if safe_sql and safe_sql.strip().lower() != text:
+        if safe_sql and normalize_sql(safe_sql) != text:
             return {
                 "allowed": True,
                 "policy": "SAFE_LIMIT_APPLIED",
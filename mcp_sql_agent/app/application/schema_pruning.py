@@ -0,0 +1,59 @@
+import re
+
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_MAX_PROMPT_TABLES = 20
+
+
+def _tokens(text: str) -> set[str]:
+    """Return lower-cased word tokens with a naive plural "s" stripped."""
+    return {
+        word[:-1] if len(word) > 3 and word.endswith("s") else word
+        for word in _WORD_RE.findall(text.lower())
+    }
+
+
+def prune_schema(
+    nl_query: str, schema: dict, max_tables: int = _MAX_PROMPT_TABLES
+) -> dict:
+    """Return the tables most relevant to a NL request, for the LLM prompt.
+
+    Tables are scored by word overlap between the request and their table
+    (weighted double) and column names; the top max_tables are kept, topped
+    up with their direct foreign-key neighbours so joins stay expressible.
+    Small schemas, and requests matching no table, get every table.
+
+    Args:
+        nl_query: Natural language request from the caller.
+        schema: Schema metadata with "tables" and "foreign_keys".
+        max_tables: Table count above which pruning applies.
+    Returns:
+        Dict of table name -> columns, in schema order.
+    """
+    tables = schema.get("tables", {})
+    if len(tables) <= max_tables:
+        return tables
+    query_tokens = _tokens(nl_query)
+    scores = {}
+    for table, columns in tables.items():
+        column_tokens = set().union(*(_tokens(c["name"]) for c in columns))
+        score = 2 * len(query_tokens & _tokens(table)) + len(
+            query_tokens & column_tokens
+        )
+        if score:
+            scores[table] = score
+    if not scores:
+        return tables
+
+    # sorted() is stable, so ties keep schema order.
+    ranked = set(sorted(scores, key=scores.__getitem__, reverse=True)[:max_tables])
+    selected = set(ranked)
+    for fk in schema.get("foreign_keys", []):
+        if len(selected) >= max_tables:
+            break
+        table, referred = fk.get("table"), fk.get("referred_table")
+        if table in ranked and referred in tables:
+            selected.add(referred)
+        elif referred in ranked and table in tables:
+            selected.add(table)
+    return {table: columns for table, columns in tables.items() if table in selected}
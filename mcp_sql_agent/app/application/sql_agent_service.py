@@ -1,15 +1,22 @@
 from collections.abc import Callable
+from functools import cached_property
+from typing import TYPE_CHECKING
 
 from mcp_sql_agent.app.application.audit_log import write_event
-from mcp_sql_agent.app.application.query_cache import QueryCache
-from mcp_sql_agent.app.application.use_cases.ask_db import AskDbUseCase
-from mcp_sql_agent.app.application.use_cases.get_erd import GetErdUseCase
-from mcp_sql_agent.app.application.use_cases.plan_query import PlanQueryUseCase
-from mcp_sql_agent.app.application.use_cases.run_sql import RunSqlUseCase
-from mcp_sql_agent.app.application.use_cases.run_sql_write import RunSqlWriteUseCase
-from mcp_sql_agent.app.application.use_cases.translate import TranslateUseCase
 from mcp_sql_agent.app.domain.ports import LlmTranslator, SqlAdapterProvider
 
+if TYPE_CHECKING:
+    from mcp_sql_agent.app.application.plan_cache import PlanCache
+    from mcp_sql_agent.app.application.query_cache import QueryCache
+    from mcp_sql_agent.app.application.use_cases import (
+        AskDbUseCase,
+        GetErdUseCase,
+        PlanQueryUseCase,
+        RunSqlUseCase,
+        RunSqlWriteUseCase,
+        TranslateUseCase,
+    )
+
 
 class SqlAgentService:
     """Facade that coordinates SQL agent use cases and audit logging."""
@@ -22,20 +29,80 @@ class SqlAgentService:
         self._adapter_provider = adapter_provider
         self._translator_provider = translator_provider
         self._translator: LlmTranslator | None = None
-        self._query_cache = QueryCache()
-        # Use cases capture business workflows; this service is a thin facade.
-        self._translate_use_case = TranslateUseCase(
-            adapter_provider, self._get_translator, cache=self._query_cache
+
+    # Use cases capture business workflows; this service is a thin facade.
+    # Each (and the caches they share) is imported and built on first use to
+    # keep process start-up cheap.
+    @cached_property
+    def _query_cache(self) -> "QueryCache":
+        """Return the translation cache, built on first use."""
+        from mcp_sql_agent.app.application.persistent_cache import store_from_env
+        from mcp_sql_agent.app.application.query_cache import QueryCache
+
+        # Translations cost an LLM round trip, so they can outlive the
+        # process (QUERY_CACHE_PATH).
+        return QueryCache(disk=store_from_env())
+
+    @cached_property
+    def _plan_cache(self) -> "PlanCache":
+        """Return the plan cache, built on first use."""
+        from mcp_sql_agent.app.application.plan_cache import PlanCache
+
+        # Plans hold EXPLAIN estimates, so they stay in memory.
+        return PlanCache()
+
+    @cached_property
+    def _translate_use_case(self) -> "TranslateUseCase":
+        """Return the translate use case, built on first use."""
+        from mcp_sql_agent.app.application.use_cases.translate import TranslateUseCase
+
+        return TranslateUseCase(
+            self._adapter_provider, self._get_translator, cache=self._query_cache
+        )
+
+    @cached_property
+    def _plan_query_use_case(self) -> "PlanQueryUseCase":
+        """Return the plan-query use case, built on first use."""
+        from mcp_sql_agent.app.application.use_cases.plan_query import PlanQueryUseCase
+
+        return PlanQueryUseCase(
+            self._adapter_provider, self._translate_use_case, plan_cache=self._plan_cache
         )
-        self._plan_query_use_case = PlanQueryUseCase(
-            adapter_provider, self._translate_use_case
+
+    @cached_property
+    def _run_sql_use_case(self) -> "RunSqlUseCase":
+        """Return the read-query use case, built on first use."""
+        from mcp_sql_agent.app.application.use_cases.run_sql import RunSqlUseCase
+
+        return RunSqlUseCase(self._adapter_provider, plan_cache=self._plan_cache)
+
+    @cached_property
+    def _run_sql_write_use_case(self) -> "RunSqlWriteUseCase":
+        """Return the write-query use case, built on first use."""
+        from mcp_sql_agent.app.application.use_cases.run_sql_write import (
+            RunSqlWriteUseCase,
         )
-        self._run_sql_use_case = RunSqlUseCase(adapter_provider)
-        self._run_sql_write_use_case = RunSqlWriteUseCase(adapter_provider)
-        self._ask_db_use_case = AskDbUseCase(
-            adapter_provider, self._translate_use_case, self._run_sql_use_case
+
+        return RunSqlWriteUseCase(self._adapter_provider)
+
+    @cached_property
+    def _ask_db_use_case(self) -> "AskDbUseCase":
+        """Return the ask-db use case, built on first use."""
+        from mcp_sql_agent.app.application.use_cases.ask_db import AskDbUseCase
+
+        return AskDbUseCase(
+            self._adapter_provider,
+            self._translate_use_case,
+            self._run_sql_use_case,
+            plan_cache=self._plan_cache,
         )
-        self._get_erd_use_case = GetErdUseCase(adapter_provider)
+
+    @cached_property
+    def _get_erd_use_case(self) -> "GetErdUseCase":
+        """Return the ERD use case, built on first use."""
+        from mcp_sql_agent.app.application.use_cases.get_erd import GetErdUseCase
+
+        return GetErdUseCase(self._adapter_provider)
 
     def _get_translator(self) -> LlmTranslator:
         """Return a lazily constructed translator instance."""
@@ -44,6 +111,14 @@ class SqlAgentService:
             self._translator = self._translator_provider()
         return self._translator
 
+    async def aclose(self) -> None:
+        """Release the translator's HTTP pool and the database connection pools."""
+        aclose = getattr(self._translator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        self._translator = None
+        await self._adapter_provider.aclose()
+
     async def get_schema(self, db_url: str | None = None) -> dict:
         """Return schema metadata for the configured or provided DB URL.
 
@@ -97,12 +172,12 @@ class SqlAgentService:
         Returns:
             Dict with SQL, EXPLAIN, risk signals, and metrics.
         Side Effects:
-            Appends an audit event to the configured audit log.
+            Queues an audit event for the configured audit log.
         """
         result = await self._plan_query_use_case.execute(
             nl_query, db_url=db_url, safe_limit=safe_limit
         )
-        await write_event(
+        write_event(
             {
                 "event": "plan_query",
                 "nl_query": nl_query,
@@ -140,7 +215,7 @@ class SqlAgentService:
         Returns:
             Dict with rows, policy metadata, and optional formatting.
         Side Effects:
-            Appends an audit event to the configured audit log.
+            Queues an audit event for the configured audit log.
         """
         metrics = {
             "schema_ms": None,
@@ -162,7 +237,7 @@ class SqlAgentService:
             output_format=output_format,
             metrics=metrics,
         )
-        await write_event(
+        write_event(
             {
                 "event": "run_sql",
                 "sql": sql,
@@ -185,12 +260,12 @@ class SqlAgentService:
         Returns:
             Dict with affected row count and policy metadata.
         Side Effects:
-            Appends an audit event to the configured audit log.
+            Queues an audit event for the configured audit log.
         """
         result = await self._run_sql_write_use_case.execute(
             sql, db_url=db_url, allow_write=allow_write
         )
-        await write_event(
+        write_event(
             {
                 "event": "run_sql_write",
                 "sql": sql,
@@ -229,7 +304,7 @@ class SqlAgentService:
         Returns:
             Dict with SQL, recommended SQL, plan metadata, and optional results.
         Side Effects:
-            Appends an audit event to the configured audit log.
+            Queues an audit event for the configured audit log.
         """
         result = await self._ask_db_use_case.execute(
             nl_query,
@@ -243,7 +318,7 @@ class SqlAgentService:
             preview_limit=preview_limit,
             output_format=output_format,
         )
-        await write_event(
+        write_event(
             {
                 "event": "ask_db",
                 "nl_query": nl_query,
@@ -261,7 +336,11 @@ class SqlAgentService:
             db_url: New default DB URL for subsequent calls.
         Returns:
             Dict containing updated configuration metadata.
+        Side Effects:
+            Drops cached query plans, which were built for the previous DB.
         """
+        if "_plan_cache" in self.__dict__:
+            self._plan_cache.clear()
         return await self._adapter_provider.set_db_url(db_url)
 
     async def db_debug(self) -> dict:
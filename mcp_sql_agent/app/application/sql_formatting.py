@@ -1,17 +1,50 @@
-def _format_table_grid(headers: list[str], rows: list[dict], col_widths: dict) -> str:
-    """Render rows into an ASCII grid table."""
-    def _border() -> str:
-        parts = ["+" + "-" * (col_widths[h] + 2) for h in headers]
-        return "".join(parts) + "+"
+import csv
+import io
+from collections.abc import Sequence
+from operator import itemgetter
 
-    def _row(values: list[str]) -> str:
-        parts = [f"| {str(v).ljust(col_widths[h])} " for h, v in zip(headers, values)]
-        return "".join(parts) + "|"
 
-    lines = [_border(), _row(headers), _border()]
+def _string_grid(headers: list[str], rows: list[dict]) -> list[tuple[str, ...]]:
+    """Stringify every cell once so width calculation and rendering share it."""
+    # itemgetter fetches a whole row in C; rows missing a column fall back to "".
+    if len(headers) == 1:
+        key = headers[0]
+
+        def getter(row: dict) -> tuple:
+            return (row[key],)
+    else:
+        getter = itemgetter(*headers)
+    grid = []
     for row in rows:
-        lines.append(_row([row.get(h, "") for h in headers]))
-    lines.append(_border())
+        try:
+            values = getter(row)
+        except KeyError:
+            values = [row.get(h, "") for h in headers]
+        grid.append(tuple(map(str, values)))
+    return grid
+
+
+def _column_widths(header_strs: list[str], grid: list[tuple[str, ...]]) -> list[int]:
+    """Return the max rendered width of each column, header included."""
+    if not grid:
+        return [len(h) for h in header_strs]
+    return [
+        max(len(h), max(map(len, column)))
+        for h, column in zip(header_strs, zip(*grid))
+    ]
+
+
+def _format_table_grid(
+    header_strs: list[str], grid: list[tuple[str, ...]], widths: list[int]
+) -> str:
+    """Render stringified rows into an ASCII grid table."""
+    border = "".join("+" + "-" * (w + 2) for w in widths) + "+"
+    # One C-level %-format per row instead of an ljust per cell.
+    row_fmt = "| " + " | ".join(f"%-{w}s" for w in widths) + " |"
+
+    lines = [border, row_fmt % tuple(header_strs), border]
+    lines.extend(row_fmt % cells for cells in grid)
+    lines.append(border)
     return "\n".join(lines)
 
 
@@ -21,23 +54,40 @@ def format_table(rows: list[dict], style: str = "simple") -> str:
         return ""
 
     headers = list(rows[0].keys())
-    col_widths = {h: len(str(h)) for h in headers}
-    for row in rows:
-        for h in headers:
-            col_widths[h] = max(col_widths[h], len(str(row.get(h, ""))))
+    return _render_table([str(h) for h in headers], _string_grid(headers, rows), style)
+
+
+def format_table_rows(
+    headers: list[str], rows: Sequence[Sequence], style: str = "simple"
+) -> str:
+    """Format positional rows (e.g. driver row tuples) as an ASCII table.
+
+    Args:
+        headers: Column names, in row order.
+        rows: Rows whose cells line up with headers.
+        style: "simple" (default) or "grid".
+    Returns:
+        Table text; empty when there are no rows.
+    """
+    if not rows:
+        return ""
+    grid = [tuple(map(str, row)) for row in rows]
+    return _render_table([str(h) for h in headers], grid, style)
+
 
-    def _line(values: list[str]) -> str:
-        parts = []
-        for h, v in zip(headers, values):
-            parts.append(str(v).ljust(col_widths[h]))
-        return " | ".join(parts)
+def _render_table(
+    header_strs: list[str], grid: list[tuple[str, ...]], style: str
+) -> str:
+    """Render a stringified grid in the requested table style."""
+    widths = _column_widths(header_strs, grid)
 
     if style == "grid":
-        return _format_table_grid(headers, rows, col_widths)
+        return _format_table_grid(header_strs, grid, widths)
 
-    header_line = _line(headers)
-    sep_line = "-+-".join("-" * col_widths[h] for h in headers)
-    body_lines = [_line([row.get(h, "") for h in headers]) for row in rows]
+    line_fmt = " | ".join(f"%-{w}s" for w in widths)
+    header_line = line_fmt % tuple(header_strs)
+    sep_line = "-+-".join("-" * w for w in widths)
+    body_lines = [line_fmt % cells for cells in grid]
     return "\n".join([header_line, sep_line, *body_lines])
 
 
@@ -46,14 +96,24 @@ def format_csv(rows: list[dict]) -> str:
     if not rows:
         return ""
     headers = list(rows[0].keys())
-    lines = [",".join(headers)]
-    for row in rows:
-        values = []
-        for h in headers:
-            value = str(row.get(h, ""))
-            if "," in value or "\"" in value:
-                value = value.replace("\"", "\"\"")
-                value = f"\"{value}\""
-            values.append(value)
-        lines.append(",".join(values))
-    return "\n".join(lines)
+    return format_csv_rows(headers, _string_grid(headers, rows))
+
+
+def format_csv_rows(headers: list[str], rows: Sequence[Sequence]) -> str:
+    """Format positional rows (e.g. driver row tuples) as CSV.
+
+    Args:
+        headers: Column names, in row order.
+        rows: Rows whose cells line up with headers.
+    Returns:
+        CSV text without a trailing newline; empty when there are no rows.
+    """
+    if not rows:
+        return ""
+    buf = io.StringIO()
+    # csv's C writer does the quoting; cells are stringified first so None
+    # renders as "None" rather than an empty field.
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(headers)
+    writer.writerows(map(str, row) for row in rows)
+    return buf.getvalue()[:-1]
@@ -1,26 +1,56 @@
 import json
 import logging
 import re
+from collections import deque
+from collections.abc import Iterable, Iterator
+from functools import lru_cache
+from typing import TypeVar
 
 from mcp_sql_agent.app.domain.ports import SqlAdapter
 from mcp_sql_agent.app.application.dto import QueryPlanDto
 from mcp_sql_agent.app.application.sql_validation import (
     apply_limit,
     has_limit,
+    normalize_sql,
     strip_trailing_semicolon,
 )
 
 
 logger = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
 
+_POSTGRES_DIALECTS = frozenset({"postgresql", "postgres"})
+_SQLITE_DIALECT = "sqlite"
+
+# SQL text is lower-cased before matching, so patterns are lower-case only.
+_FROM_TABLE_RE = re.compile(r"from\s+([a-z0-9_\.]+)")
+_JOIN_TABLE_RE = re.compile(r"join\s+([a-z0-9_\.]+)")
+_WHERE_CLAUSE_RE = re.compile(
+    r"where\s+(.*?)(group\s+by|order\s+by|limit|$)", re.DOTALL
+)
+_GROUP_BY_RE = re.compile(r"group\s+by\s+(.*?)(order\s+by|limit|$)", re.DOTALL)
+_ORDER_BY_RE = re.compile(r"order\s+by\s+(.*?)(limit|$)", re.DOTALL)
+_LIMIT_VALUE_RE = re.compile(r"\blimit\s+(\d+)")
+_AGGREGATE_FUNCTIONS = ("count", "sum", "avg", "min", "max")
+_AGGREGATE_CALL_RE = re.compile(r"\b(count|sum|avg|min|max)\s*\(")
+_JOIN_ON_COLUMN_RE = re.compile(
+    r"join\s+([a-z0-9_]+)\s+on\s+([a-z0-9_]+)\.([a-z0-9_]+)"
+)
+_WHERE_COLUMN_RE = re.compile(r"where\s+([a-z0-9_]+)\.([a-z0-9_]+)")
+_ORDER_COLUMN_RE = re.compile(r"order\s+by\s+([a-z0-9_]+)\.([a-z0-9_]+)")
+_LIKE_WILDCARD_RE = re.compile(r"like\s+'%.*%'")
+_SELECT_STAR_RE = re.compile(r"\bselect\s+\*")
+
+
+@lru_cache(maxsize=1024)
 def _build_explain_sql(sql: str, dialect: str) -> str:
     """Return a dialect-specific EXPLAIN statement for the SQL."""
     # Normalize EXPLAIN shape per dialect so downstream parsing stays simple.
     base, _ = strip_trailing_semicolon(sql)
-    if dialect == "sqlite":
+    if dialect == _SQLITE_DIALECT:
         return f"EXPLAIN QUERY PLAN {base}"
-    if dialect in {"postgresql", "postgres"}:
+    if dialect in _POSTGRES_DIALECTS:
         return f"EXPLAIN (FORMAT JSON) {base}"
     return f"EXPLAIN {base}"
 
@@ -42,11 +72,18 @@ def _extract_postgres_plan(rows: list[dict]) -> dict:
     if not rows:
         return {}
     first = rows[0]
-    plan_value = None
-    for key in first.keys():
-        if key.lower().replace("_", " ") == "query plan":
-            plan_value = first[key]
-            break
+    # Postgres names the column "QUERY PLAN"; only scan keys when it does not.
+    if "QUERY PLAN" in first:
+        plan_value = first["QUERY PLAN"]
+    else:
+        plan_value = next(
+            (
+                value
+                for key, value in first.items()
+                if key.lower().replace("_", " ") == "query plan"
+            ),
+            None,
+        )
     if isinstance(plan_value, str):
         try:
             plan_value = json.loads(plan_value)
@@ -61,109 +98,138 @@ def _extract_postgres_plan(rows: list[dict]) -> dict:
     return {}
 
 
-def _extract_tables(sql: str) -> list[str]:
-    """Extract table names from FROM/JOIN clauses."""
-    text = sql.lower()
-    tables = re.findall(r"from\\s+([a-z0-9_\\.]+)", text)
-    tables += re.findall(r"join\\s+([a-z0-9_\\.]+)", text)
-    cleaned = [t.split(".")[-1] for t in tables]
-    return list(dict.fromkeys(cleaned))
-
-
-def _extract_joins(sql: str) -> list[str]:
-    """Extract JOIN targets from SQL text."""
-    text = sql.lower()
-    return re.findall(r"join\\s+([a-z0-9_\\.]+)", text)
-
-
-def _extract_filters(sql: str) -> list[str]:
-    """Extract a simplified WHERE clause for plan metadata."""
-    text = sql.lower()
-    where_match = re.search(r"where\\s+(.*?)(group\\s+by|order\\s+by|limit|$)", text)
-    if not where_match:
-        return []
-    clause = where_match.group(1).strip()
-    return [clause] if clause else []
-
-
-def _extract_group_by(sql: str) -> list[str]:
-    """Extract GROUP BY columns from SQL text."""
-    text = sql.lower()
-    match = re.search(r"group\\s+by\\s+(.*?)(order\\s+by|limit|$)", text)
-    if not match:
-        return []
-    return [s.strip() for s in match.group(1).split(",") if s.strip()]
+def _dedup_ordered(items: Iterable[_T]) -> list[_T]:
+    """Return items without duplicates, keeping first-seen order."""
+    # dict.fromkeys measured faster than a set-plus-comprehension here.
+    return list(dict.fromkeys(items))
+
+
+def _aggregations(text: str) -> list[str]:
+    """Return aggregate functions called in lower-cased SQL, in canonical order."""
+    found = set(_AGGREGATE_CALL_RE.findall(text))
+    return [fn for fn in _AGGREGATE_FUNCTIONS if fn in found]
+
+
+def _split_columns(clause: str) -> list[str]:
+    """Split a comma-separated clause body into trimmed, non-empty parts."""
+    return [part.strip() for part in clause.split(",") if part.strip()]
+
+
+def _parse_sql_shape(sql: str) -> dict:
+    """Extract tables, joins, clauses, LIMIT and aggregates from SQL text.
+
+    Lower-cases the SQL once and shares the JOIN scan between tables and
+    joins; clause patterns only run when their keyword is present.
+
+    Returns:
+        Dict with tables, joins, filters, group_by, order_by, limit and
+        aggregations for the plan summary.
+    """
+    text = normalize_sql(sql)
+    joins = _JOIN_TABLE_RE.findall(text) if "join" in text else []
+    tables = [t.split(".")[-1] for t in _FROM_TABLE_RE.findall(text) + joins]
+
+    filters: list[str] = []
+    if "where" in text:
+        match = _WHERE_CLAUSE_RE.search(text)
+        clause = match.group(1).strip() if match else ""
+        if clause:
+            filters.append(clause)
+    group_by: list[str] = []
+    if "group" in text:
+        match = _GROUP_BY_RE.search(text)
+        if match:
+            group_by = _split_columns(match.group(1))
+    order_by: list[str] = []
+    if "order" in text:
+        match = _ORDER_BY_RE.search(text)
+        if match:
+            order_by = _split_columns(match.group(1))
+    limit_value = None
+    if "limit" in text:
+        match = _LIMIT_VALUE_RE.search(text)
+        if match:
+            limit_value = int(match.group(1))
 
+    return {
+        "tables": _dedup_ordered(tables),
+        "joins": joins,
+        "filters": filters,
+        "group_by": group_by,
+        "order_by": order_by,
+        "limit": limit_value,
+        "aggregations": _aggregations(text),
+    }
 
-def _extract_order_by(sql: str) -> list[str]:
-    """Extract ORDER BY columns from SQL text."""
-    text = sql.lower()
-    match = re.search(r"order\\s+by\\s+(.*?)(limit|$)", text)
-    if not match:
-        return []
-    return [s.strip() for s in match.group(1).split(",") if s.strip()]
 
+def _fk_edges(schema: dict) -> tuple[tuple[str, str], ...]:
+    """Return the schema's foreign keys as hashable (table, referred_table) pairs."""
+    edges = []
+    for fk in schema.get("foreign_keys", []):
+        src = fk.get("table")
+        dst = fk.get("referred_table")
+        if src and dst:
+            edges.append((src, dst))
+    return tuple(edges)
 
-def _extract_limit(sql: str) -> int | None:
-    """Extract a numeric LIMIT value if present."""
-    match = re.search(r"\\blimit\\s+(\\d+)", sql.lower())
-    if not match:
-        return None
-    return int(match.group(1))
 
+@lru_cache(maxsize=64)
+def _build_schema_graph(edges: tuple[tuple[str, str], ...]) -> dict:
+    """Build an undirected graph of table relationships from foreign keys.
 
-def _extract_aggregations(sql: str) -> list[str]:
-    """Return aggregate functions referenced in the SQL text."""
-    text = sql.lower()
-    aggs = []
-    for fn in ["count", "sum", "avg", "min", "max"]:
-        if f"{fn}(" in text:
-            aggs.append(fn)
-    return aggs
+    Memoized per edge set; the returned graph is shared and must not be mutated.
+    """
+    # Dicts as ordered sets: neighbours keep foreign-key order, which is
+    # deterministic (unlike set order), so no sort is needed.
+    graph: dict[str, dict[str, None]] = {}
+    for src, dst in edges:
+        graph.setdefault(src, {})[dst] = None
+        graph.setdefault(dst, {})[src] = None
+    return {k: tuple(v) for k, v in graph.items()}
 
 
-def _build_schema_graph(schema: dict) -> dict:
-    """Build an undirected graph of table relationships from foreign keys."""
-    graph: dict[str, set[str]] = {}
-    for fk in schema.get("foreign_keys", []):
-        src = fk.get("table")
-        dst = fk.get("referred_table")
-        if not src or not dst:
-            continue
-        graph.setdefault(src, set()).add(dst)
-        graph.setdefault(dst, set()).add(src)
-    return {k: sorted(v) for k, v in graph.items()}
+@lru_cache(maxsize=4096)
+def _cached_join_path(
+    edges: tuple[tuple[str, str], ...], start: str, end: str
+) -> tuple[str, ...]:
+    """Return the join path between two tables for an edge set, memoized."""
+    return tuple(_find_join_path(_build_schema_graph(edges), start, end))
 
 
 def _find_join_path(graph: dict, start: str, end: str) -> list[str]:
     """Return a join path between two tables using BFS."""
     if start == end:
         return [start]
-    queue = [(start, [start])]
-    visited = {start}
+    # Parent pointers instead of per-node path copies; rebuilt once at the end.
+    parents: dict[str, str | None] = {start: None}
+    queue = deque([start])
     while queue:
-        node, path = queue.pop(0)
+        node = queue.popleft()
         for neighbor in graph.get(node, []):
-            if neighbor in visited:
+            if neighbor in parents:
                 continue
+            parents[neighbor] = node
             if neighbor == end:
-                return path + [neighbor]
-            visited.add(neighbor)
-            queue.append((neighbor, path + [neighbor]))
+                path = [neighbor]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])
+                return path[::-1]
+            queue.append(neighbor)
     return []
 
 
 def _build_plan_json(sql: str, schema: dict | None = None) -> dict:
     """Build a light-weight plan summary from SQL text and schema."""
-    tables = _extract_tables(sql)
-    joins = _extract_joins(sql)
-    filters = _extract_filters(sql)
-    group_by = _extract_group_by(sql)
-    order_by = _extract_order_by(sql)
-    limit_value = _extract_limit(sql)
-    aggregations = _extract_aggregations(sql)
+    shape = _parse_sql_shape(sql)
+    tables = shape["tables"]
+    joins = shape["joins"]
+    filters = shape["filters"]
+    group_by = shape["group_by"]
+    order_by = shape["order_by"]
+    limit_value = shape["limit"]
+    aggregations = shape["aggregations"]
     intent = "read"
-    if sql.strip().lower().startswith(("insert", "update", "delete")):
+    if normalize_sql(sql).startswith(("insert", "update", "delete")):
         intent = "write"
     confidence = 0.6
     if tables:
@@ -176,12 +242,14 @@ def _build_plan_json(sql: str, schema: dict | None = None) -> dict:
 
     join_paths = []
     if schema:
-        graph = _build_schema_graph(schema)
+        # Schemas rarely change between requests, so graphs and paths are
+        # memoized on the foreign-key edge set.
+        edges = _fk_edges(schema)
         for i, left in enumerate(tables):
             for right in tables[i + 1 :]:
-                path = _find_join_path(graph, left, right)
+                path = _cached_join_path(edges, left, right)
                 if path:
-                    join_paths.append({"from": left, "to": right, "path": path})
+                    join_paths.append({"from": left, "to": right, "path": list(path)})
 
     return {
         "intent": intent,
@@ -197,104 +265,98 @@ def _build_plan_json(sql: str, schema: dict | None = None) -> dict:
     }
 
 
-def _walk_plan_nodes(plan: dict) -> list[dict]:
-    """Flatten EXPLAIN plan nodes into a list."""
-    if not plan:
-        return []
-    nodes = [plan]
-    for child in plan.get("Plans", []) or []:
-        nodes.extend(_walk_plan_nodes(child))
-    return nodes
+def _walk_plan_nodes(plan: dict) -> Iterator[dict]:
+    """Yield EXPLAIN plan nodes depth-first, parents before children."""
+    stack = [plan] if plan else []
+    while stack:
+        node = stack.pop()
+        yield node
+        children = node.get("Plans")
+        if children:
+            # Reversed so children pop in plan order (pre-order traversal).
+            stack.extend(reversed(children))
+
 
+def _analyze_plan(dialect: str, explain_rows: list[dict]) -> dict:
+    """Extract estimate metrics and risk signals from EXPLAIN output.
 
-def _estimate_from_plan(dialect: str, explain_rows: list[dict]) -> dict:
-    """Extract estimate metrics from EXPLAIN output when available."""
-    estimate = {"estimate_ms": None, "plan_rows": None, "total_cost": None}
-    if dialect in {"postgresql", "postgres"}:
+    The Postgres plan is extracted once and walked once for both.
+
+    Returns:
+        Dict with estimate_ms, plan_rows, total_cost and plan_risks.
+    """
+    meta = {"estimate_ms": None, "plan_rows": None, "total_cost": None}
+    risks: list[str] = []
+    meta["plan_risks"] = risks
+    if dialect in _POSTGRES_DIALECTS:
         plan = _extract_postgres_plan(explain_rows)
         if not plan:
-            return estimate
+            return meta
         total_cost = plan.get("Total Cost")
-        plan_rows = plan.get("Plan Rows")
-        estimate["total_cost"] = total_cost
-        estimate["plan_rows"] = plan_rows
+        meta["total_cost"] = total_cost
+        meta["plan_rows"] = plan.get("Plan Rows")
         if isinstance(total_cost, (int, float)):
-            estimate["estimate_ms"] = round(float(total_cost), 2)
-    return estimate
-
-
-def _detect_plan_risks(dialect: str, explain_rows: list[dict]) -> list[str]:
-    """Detect common risk patterns from EXPLAIN output."""
-    risks = []
-    if dialect in {"postgresql", "postgres"}:
-        plan = _extract_postgres_plan(explain_rows)
+            meta["estimate_ms"] = round(float(total_cost), 2)
         for node in _walk_plan_nodes(plan):
-            if node.get("Node Type") == "Seq Scan":
+            node_type = node.get("Node Type")
+            if node_type == "Seq Scan":
                 rel = node.get("Relation Name") or "table"
                 risks.append(f"Sequential scan on {rel}.")
-            if node.get("Node Type") == "Nested Loop":
+            elif node_type == "Nested Loop":
                 plan_rows = node.get("Plan Rows")
                 if isinstance(plan_rows, (int, float)) and plan_rows > 5000:
                     risks.append("Large nested loop join detected.")
-    if dialect == "sqlite":
+    elif dialect == _SQLITE_DIALECT:
         for row in explain_rows:
             detail = str(row.get("detail", ""))
             if "SCAN" in detail.upper():
                 risks.append("Full table scan detected.")
-    return risks
+    return meta
 
 
 def _suggest_indexes_from_sql(sql: str) -> list[str]:
     """Return naive index suggestions derived from SQL text."""
-    text = sql.lower()
-    suggestions = []
-    join_matches = re.findall(
-        r"join\\s+([a-z0-9_]+)\\s+on\\s+([a-z0-9_]+)\\.([a-z0-9_]+)",
-        text,
-    )
-    for _, table, column in join_matches:
-        suggestions.append(f"Consider index on {table}.{column}.")
-
-    where_matches = re.findall(r"where\\s+([a-z0-9_]+)\\.([a-z0-9_]+)", text)
-    for table, column in where_matches:
-        suggestions.append(f"Consider index on {table}.{column}.")
-
-    order_matches = re.findall(r"order\\s+by\\s+([a-z0-9_]+)\\.([a-z0-9_]+)", text)
-    for table, column in order_matches:
-        suggestions.append(f"Consider index on {table}.{column} for ORDER BY.")
-
-    return list(dict.fromkeys(suggestions))
+    text = normalize_sql(sql)
+    # Dedup on (table, column, suffix) before formatting any message.
+    targets = [(t, c, "") for _, t, c in _JOIN_ON_COLUMN_RE.findall(text)]
+    targets += [(t, c, "") for t, c in _WHERE_COLUMN_RE.findall(text)]
+    targets += [(t, c, " for ORDER BY") for t, c in _ORDER_COLUMN_RE.findall(text)]
+    return [
+        f"Consider index on {table}.{column}{suffix}."
+        for table, column, suffix in _dedup_ordered(targets)
+    ]
 
 
 def _assess_query_risk(sql: str, plan_meta: dict) -> dict:
     """Assess query risk using text heuristics and plan metadata."""
     # Lightweight heuristics to flag common slow-query patterns.
-    text = sql.strip().lower()
+    text = normalize_sql(sql)
     risks = []
     improvements = []
     score = 0.0
 
-    if " where " not in f" {text} " and not has_limit(text):
+    padded = f" {text} "
+    if " where " not in padded and not has_limit(text):
         risks.append("SELECT without WHERE or LIMIT.")
         improvements.append("Add WHERE filters to reduce scanned rows.")
         score += 0.3
 
-    if " join " in f" {text} ":
+    if " join " in padded:
         risks.append("JOIN detected; ensure indexed join keys.")
         improvements.append("Add indexes on JOIN columns if missing.")
         score += 0.1
 
-    if re.search(r"like\\s+'%.*%'", text):
+    if _LIKE_WILDCARD_RE.search(text):
         risks.append("Leading wildcard LIKE can be slow.")
         improvements.append("Prefer prefix search or use a trigram/full-text index.")
         score += 0.2
 
-    if " order by " in f" {text} " and not has_limit(text):
+    if " order by " in padded and not has_limit(text):
         risks.append("ORDER BY without LIMIT can be expensive.")
         improvements.append("Add LIMIT when ordering large tables.")
         score += 0.1
 
-    if re.search(r"\\bselect\\s+\\*\\b", text):
+    if _SELECT_STAR_RE.search(text):
         risks.append("SELECT * can fetch unnecessary columns.")
         improvements.append("Select only the columns you need.")
         score += 0.05
@@ -323,15 +385,27 @@ def _assess_query_risk(sql: str, plan_meta: dict) -> dict:
 
 
 async def build_query_plan(
-    sql: str, adapter: SqlAdapter, safe_limit: int, schema: dict | None = None
+    sql: str,
+    adapter: SqlAdapter,
+    safe_limit: int,
+    schema: dict | None = None,
+    run_explain: bool = True,
+    explain: dict | None = None,
 ) -> dict:
-    """Build a full query plan with EXPLAIN, risks, and safe SQL."""
-    explain = await _run_explain(sql, adapter)
+    """Build a full query plan with EXPLAIN, risks, and safe SQL.
+
+    With run_explain=False the EXPLAIN round trip is skipped and the plan
+    carries text-based risk signals only. A previously obtained EXPLAIN
+    result can be passed as explain to reuse it instead of running one.
+    """
+    reused_explain = explain is not None
+    if explain is None:
+        if run_explain:
+            explain = await _run_explain(sql, adapter)
+        else:
+            explain = {"dialect": await adapter.get_dialect(), "skipped": True}
     plan_rows = explain.get("rows", [])
-    plan_meta = _estimate_from_plan(explain.get("dialect", "sql"), plan_rows)
-    plan_meta["plan_risks"] = _detect_plan_risks(
-        explain.get("dialect", "sql"), plan_rows
-    )
+    plan_meta = _analyze_plan(explain.get("dialect", "sql"), plan_rows)
     risk = _assess_query_risk(sql, plan_meta)
     plan_json = _build_plan_json(sql, schema=schema)
     risk_level = "low"
@@ -345,7 +419,11 @@ async def build_query_plan(
     notes = []
     if limit_added:
         notes.append(f"Added LIMIT {safe_limit} for safety.")
-    if plan_meta.get("estimate_ms") is not None:
+    if reused_explain:
+        notes.append("EXPLAIN reused from a query differing only in literals.")
+    if explain.get("skipped"):
+        notes.append("EXPLAIN skipped; risk signals are based on SQL text only.")
+    elif plan_meta.get("estimate_ms") is not None:
         notes.append("Runtime estimate is based on EXPLAIN cost (rough estimate).")
     else:
         notes.append("Runtime estimate unavailable for this dialect.")
@@ -363,4 +441,9 @@ async def build_query_plan(
         "safe_sql": safe_sql,
         "notes": notes,
     }
-    return QueryPlanDto.from_dict(plan).to_dict()
+    # The dict is built right here with a fixed shape, so the DTO check only
+    # guards against regressions and is skipped under python -O. It is returned
+    # as-is rather than rebuilt through QueryPlanDto.to_dict().
+    if __debug__:
+        QueryPlanDto.from_dict(plan)
+    return plan
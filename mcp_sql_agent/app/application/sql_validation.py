@@ -1,6 +1,36 @@
+import re
+from functools import lru_cache
+
+
+# One alternation per validator: a single scan that stops at the first hit.
+_SELECT_BLOCKED_RE = re.compile(
+    r"\b(insert|update|delete|drop|alter|truncate|create|grant|revoke|copy)\b"
+)
+_WRITE_BLOCKED_RE = re.compile(r"\b(drop|alter|truncate|create|grant|revoke|copy)\b")
+# String literals and quoted identifiers; blanked before the keyword scans so
+# values like status = 'delete' are not mistaken for statements.
+_QUOTED_RE = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_LIMIT_RE = re.compile(r"\blimit\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def normalize_sql(sql: str) -> str:
+    """Return the stripped, lower-cased SQL used by validators and heuristics.
+
+    Memoized so the validator, planner and policy share one normalization of
+    the same statement; str caches its hash, so repeat lookups are cheap.
+    """
+    return sql.strip().lower()
+
+
+@lru_cache(maxsize=4096)
 def validate_sql_select(sql: str) -> tuple[bool, str]:
-    """Validate that SQL is a safe, single-statement SELECT/CTE."""
-    text = sql.strip().lower()
+    """Validate that SQL is a safe, single-statement SELECT/CTE.
+
+    Memoized on the raw SQL: the result is a pure function of the text and
+    the same statements tend to be re-run.
+    """
+    text = normalize_sql(sql)
     if not text:
         return False, "SQL is empty."
 
@@ -11,28 +41,17 @@ def validate_sql_select(sql: str) -> tuple[bool, str]:
     if ";" in text[:-1]:
         return False, "Multiple statements are not allowed."
 
-    blocked = [
-        "insert",
-        "update",
-        "delete",
-        "drop",
-        "alter",
-        "truncate",
-        "create",
-        "grant",
-        "revoke",
-        "copy",
-    ]
-    for word in blocked:
-        if f" {word} " in f" {text} ":
-            return False, f"Blocked keyword: {word}."
+    match = _SELECT_BLOCKED_RE.search(_QUOTED_RE.sub(" ", text))
+    if match:
+        return False, f"Blocked keyword: {match.group(1)}."
 
     return True, ""
 
 
+@lru_cache(maxsize=1024)
 def validate_sql_write(sql: str) -> tuple[bool, str]:
     """Validate that SQL is a safe, single-statement write operation."""
-    text = sql.strip().lower()
+    text = normalize_sql(sql)
     if not text:
         return False, "SQL is empty."
 
@@ -47,14 +66,14 @@ def validate_sql_write(sql: str) -> tuple[bool, str]:
     if ";" in text[:-1]:
         return False, "Multiple statements are not allowed."
 
-    blocked = ["drop", "alter", "truncate", "create", "grant", "revoke", "copy"]
-    for word in blocked:
-        if f" {word} " in f" {text} ":
-            return False, f"Blocked keyword: {word}."
+    match = _WRITE_BLOCKED_RE.search(_QUOTED_RE.sub(" ", text))
+    if match:
+        return False, f"Blocked keyword: {match.group(1)}."
 
     return True, ""
 
 
+@lru_cache(maxsize=1024)
 def strip_trailing_semicolon(sql: str) -> tuple[str, str]:
     """Return SQL without a trailing semicolon and the removed suffix."""
     text = sql.rstrip()
@@ -65,7 +84,7 @@ def strip_trailing_semicolon(sql: str) -> tuple[str, str]:
 
 def has_limit(sql: str) -> bool:
     """Return True when the SQL includes a LIMIT clause."""
-    return re.search(r"\blimit\b", sql, re.IGNORECASE) is not None
+    return _LIMIT_RE.search(sql) is not None
 
 
 def apply_limit(sql: str, limit: int) -> tuple[str, bool]:
@@ -74,4 +93,3 @@ def apply_limit(sql: str, limit: int) -> tuple[str, bool]:
         return sql, False
     base, semi = strip_trailing_semicolon(sql)
     return f"{base} LIMIT {limit}{semi}", True
-import re
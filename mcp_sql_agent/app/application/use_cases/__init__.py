@@ -1,9 +1,13 @@
-from mcp_sql_agent.app.application.use_cases.ask_db import AskDbUseCase
-from mcp_sql_agent.app.application.use_cases.get_erd import GetErdUseCase
-from mcp_sql_agent.app.application.use_cases.plan_query import PlanQueryUseCase
-from mcp_sql_agent.app.application.use_cases.run_sql import RunSqlUseCase
-from mcp_sql_agent.app.application.use_cases.run_sql_write import RunSqlWriteUseCase
-from mcp_sql_agent.app.application.use_cases.translate import TranslateUseCase
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mcp_sql_agent.app.application.use_cases.ask_db import AskDbUseCase
+    from mcp_sql_agent.app.application.use_cases.get_erd import GetErdUseCase
+    from mcp_sql_agent.app.application.use_cases.plan_query import PlanQueryUseCase
+    from mcp_sql_agent.app.application.use_cases.run_sql import RunSqlUseCase
+    from mcp_sql_agent.app.application.use_cases.run_sql_write import RunSqlWriteUseCase
+    from mcp_sql_agent.app.application.use_cases.translate import TranslateUseCase
 
 __all__ = [
     "AskDbUseCase",
@@ -13,3 +17,24 @@ __all__ = [
     "RunSqlWriteUseCase",
     "TranslateUseCase",
 ]
+
+# Exported name -> submodule; submodules load on first attribute access so
+# importing one use case does not import (and plan-compile) all of them.
+_SUBMODULES = {
+    "AskDbUseCase": "ask_db",
+    "GetErdUseCase": "get_erd",
+    "PlanQueryUseCase": "plan_query",
+    "RunSqlUseCase": "run_sql",
+    "RunSqlWriteUseCase": "run_sql_write",
+    "TranslateUseCase": "translate",
+}
+
+
+def __getattr__(name: str):
+    """Import the use-case class for name from its submodule on first access."""
+    submodule = _SUBMODULES.get(name)
+    if submodule is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f"{__name__}.{submodule}"), name)
+    globals()[name] = value
+    return value
@@ -1,6 +1,6 @@
 import time
 
-from mcp_sql_agent.app.application.sql_planning import build_query_plan
+from mcp_sql_agent.app.application.plan_cache import PlanCache, cached_query_plan
 from mcp_sql_agent.app.application.safety_policy import evaluate_policy
 from mcp_sql_agent.app.application.use_cases.run_sql import RunSqlUseCase
 from mcp_sql_agent.app.application.use_cases.translate import TranslateUseCase
@@ -14,11 +14,13 @@ class AskDbUseCase:
         adapter_provider: SqlAdapterProvider,
         translate_use_case: TranslateUseCase,
         run_sql_use_case: RunSqlUseCase,
+        plan_cache: PlanCache | None = None,
     ) -> None:
-        """Create the use case with translation and execution dependencies."""
+        """Create the use case with translation, execution, and plan caching."""
         self._adapter_provider = adapter_provider
         self._translate = translate_use_case
         self._run_sql = run_sql_use_case
+        self._plan_cache = plan_cache or PlanCache()
 
     async def execute(
         self,
@@ -54,8 +56,17 @@ class AskDbUseCase:
         sql = meta["sql"]
         adapter = self._adapter_provider.get_adapter(db_url)
         plan_start = time.perf_counter()
-        plan = await build_query_plan(
-            sql, adapter, safe_limit=safe_limit, schema=meta["schema"]
+        # An unsafe preview does not enforce the policy, so the EXPLAIN round
+        # trip behind its cost signals can be skipped.
+        plan = await cached_query_plan(
+            self._plan_cache,
+            sql,
+            adapter,
+            db_url,
+            meta["schema"],
+            safe_limit,
+            run_explain=not (execute and not safe and mode == "preview"),
+            with_schema=True,
         )
         compile_sql_ms = round((time.perf_counter() - plan_start) * 1000, 2)
         metrics = {
@@ -1,6 +1,6 @@
 import time
 
-from mcp_sql_agent.app.application.sql_planning import build_query_plan
+from mcp_sql_agent.app.application.plan_cache import PlanCache, cached_query_plan
 from mcp_sql_agent.app.application.safety_policy import evaluate_policy
 from mcp_sql_agent.app.application.use_cases.translate import TranslateUseCase
 from mcp_sql_agent.app.domain.ports import SqlAdapterProvider
@@ -12,10 +12,12 @@ class PlanQueryUseCase:
         self,
         adapter_provider: SqlAdapterProvider,
         translate_use_case: TranslateUseCase,
+        plan_cache: PlanCache | None = None,
     ) -> None:
-        """Create the use case with translation and adapter dependencies."""
+        """Create the use case with translation, adapter, and plan caching."""
         self._adapter_provider = adapter_provider
         self._translate = translate_use_case
+        self._plan_cache = plan_cache or PlanCache()
 
     async def execute(
         self, nl_query: str, db_url: str | None = None, safe_limit: int = 1000
@@ -34,8 +36,14 @@ class PlanQueryUseCase:
         sql = meta["sql"]
         adapter = self._adapter_provider.get_adapter(db_url)
         plan_start = time.perf_counter()
-        plan = await build_query_plan(
-            sql, adapter, safe_limit=safe_limit, schema=meta["schema"]
+        plan = await cached_query_plan(
+            self._plan_cache,
+            sql,
+            adapter,
+            db_url,
+            meta["schema"],
+            safe_limit,
+            with_schema=True,
         )
         compile_sql_ms = round((time.perf_counter() - plan_start) * 1000, 2)
         policy = evaluate_policy(sql, plan, read_only=True)
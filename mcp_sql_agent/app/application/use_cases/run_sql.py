@@ -1,18 +1,35 @@
 import time
 
 from mcp_sql_agent.app.application.dto import SqlResultDto
-from mcp_sql_agent.app.application.sql_formatting import format_csv, format_table
+from mcp_sql_agent.app.application.plan_cache import PlanCache, cached_query_plan
 from mcp_sql_agent.app.application.sql_planning import build_query_plan
+from mcp_sql_agent.app.application.sql_formatting import (
+    format_csv_rows,
+    format_table_rows,
+)
 from mcp_sql_agent.app.application.sql_validation import apply_limit, validate_sql_select
 from mcp_sql_agent.app.application.safety_policy import evaluate_policy
 from mcp_sql_agent.app.domain.ports import SqlAdapterProvider
 
 
+_POLICY_BYPASSED = {
+    "allowed": True,
+    "policy": "BYPASSED",
+    "reason": "SAFE_MODE_DISABLED",
+    "suggested_fix": "",
+}
+
+
 class RunSqlUseCase:
     """Execute read queries with planning, safety checks, and formatting."""
-    def __init__(self, adapter_provider: SqlAdapterProvider) -> None:
-        """Create the use case with a DB adapter provider."""
+    def __init__(
+        self,
+        adapter_provider: SqlAdapterProvider,
+        plan_cache: PlanCache | None = None,
+    ) -> None:
+        """Create the use case with a DB adapter provider and plan cache."""
         self._adapter_provider = adapter_provider
+        self._plan_cache = plan_cache or PlanCache()
 
     async def execute(
         self,
@@ -41,6 +58,7 @@ class RunSqlUseCase:
             mode: "execute" (default), "preview", or "explain".
             preview_limit: Row cap for preview mode.
             output_format: Output format (e.g., "json", "csv", "table").
+                With "csv" and no table, rows are returned only in the "csv" field.
             metrics: Optional dict to populate with timing/row counts.
         Returns:
             Dict containing rows, policy metadata, and optional formatting.
@@ -50,22 +68,45 @@ class RunSqlUseCase:
             return {"error": err}
 
         adapter = self._adapter_provider.get_adapter(db_url)
+        # Timings are only taken when the caller asked for metrics.
+        timed = metrics is not None
         if plan is None:
-            plan_start = time.perf_counter()
-            active_plan = await build_query_plan(sql, adapter, safe_limit=safe_limit)
-            if metrics is not None:
+            plan_start = time.perf_counter() if timed else 0.0
+            run_explain = safe or mode != "preview"
+            # Plan cache keys need the schema; use it only when already cached
+            # rather than paying a version probe or introspection per call.
+            schema = self._adapter_provider.peek_schema(db_url)
+            if schema is None:
+                active_plan = await build_query_plan(
+                    sql, adapter, safe_limit=safe_limit, run_explain=run_explain
+                )
+            else:
+                active_plan = await cached_query_plan(
+                    self._plan_cache,
+                    sql,
+                    adapter,
+                    db_url,
+                    schema,
+                    safe_limit,
+                    run_explain=run_explain,
+                )
+            if timed:
                 metrics["compile_sql_ms"] = round(
                     (time.perf_counter() - plan_start) * 1000, 2
                 )
         else:
             active_plan = plan
-        policy = evaluate_policy(sql, active_plan, read_only=True)
-        if safe and not policy["allowed"]:
-            return {
-                "error": "Query blocked by safety policy.",
-                "plan": active_plan,
-                "policy": policy,
-            }
+        if safe:
+            policy = evaluate_policy(sql, active_plan, read_only=True)
+            if not policy["allowed"]:
+                return {
+                    "error": "Query blocked by safety policy.",
+                    "plan": active_plan,
+                    "policy": policy,
+                }
+        else:
+            # The verdict would be ignored anyway; report that it was skipped.
+            policy = dict(_POLICY_BYPASSED)
 
         exec_sql = active_plan["safe_sql"] if safe else sql
         if mode == "preview":
@@ -73,16 +114,26 @@ class RunSqlUseCase:
         if mode == "explain":
             return {"plan": active_plan, "policy": policy, "metrics": metrics or {}}
 
-        exec_start = time.perf_counter()
-        rows = await adapter.query(exec_sql)
-        db_exec_ms = round((time.perf_counter() - exec_start) * 1000, 2)
-        if metrics is not None:
-            metrics["db_exec_ms"] = db_exec_ms
-            metrics["rows_returned"] = len(rows)
-        table = format_table(rows, style=table_style) if format_table_result else None
-        csv_data = format_csv(rows) if output_format == "csv" else None
+        exec_start = time.perf_counter() if timed else 0.0
+        headers, raw_rows = await adapter.query_rows(exec_sql)
+        row_count = len(raw_rows)
+        if timed:
+            metrics["db_exec_ms"] = round((time.perf_counter() - exec_start) * 1000, 2)
+            metrics["rows_returned"] = row_count
+        # Formatters read the driver's row tuples positionally; per-row dicts
+        # are only built for the "rows" field, which CSV-only output skips.
+        csv_only = output_format == "csv" and not format_table_result
+        rows = [] if csv_only else [dict(zip(headers, row)) for row in raw_rows]
+        table = (
+            format_table_rows(headers, raw_rows, style=table_style)
+            if format_table_result
+            else None
+        )
+        csv_data = (
+            format_csv_rows(headers, raw_rows) if output_format == "csv" else None
+        )
         dto = SqlResultDto.from_parts(
-            row_count=len(rows),
+            row_count=row_count,
             rows=rows,
             executed_sql=exec_sql,
             plan=active_plan,
@@ -91,7 +142,7 @@ class RunSqlUseCase:
         payload = dto.to_dict()
         if csv_data is not None:
             payload["csv"] = csv_data
-        if metrics is not None:
+        if timed:
             payload["metrics"] = metrics
         payload["policy"] = policy
         return payload
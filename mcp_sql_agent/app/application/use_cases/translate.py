@@ -1,7 +1,15 @@
 from collections.abc import Callable
 import time
 
-from mcp_sql_agent.app.application.query_cache import QueryCache, build_cache_key
+from mcp_sql_agent.app.application.query_cache import (
+    QueryCache,
+    build_cache_key_fp,
+    normalize_nl_literals,
+    render_sql_template,
+    schema_fingerprint,
+    to_sql_template,
+)
+from mcp_sql_agent.app.application.schema_pruning import prune_schema
 from mcp_sql_agent.app.domain.ports import LlmTranslator, SqlAdapterProvider
 
 
@@ -39,17 +47,27 @@ class TranslateUseCase:
         Returns:
             Dict with SQL, schema, dialect, timing metrics, and cache status.
         """
-        adapter = self._adapter_provider.get_adapter(db_url)
+        # The provider's cached schema is the same object across calls, so its
+        # fingerprint is memoized and cache keys only hash the NL text.
         schema_start = time.perf_counter()
-        schema = await adapter.get_schema()
+        schema = await self._adapter_provider.get_schema(db_url)
         schema_ms = round((time.perf_counter() - schema_start) * 1000, 2)
         dialect = schema.get("dialect", "sql")
-        tables = schema.get("tables", {})
-        cache_key = build_cache_key(nl_query, schema)
-        cached = self._cache.get(cache_key)
-        if cached:
+        schema_fp = schema_fingerprint(schema)
+        self._cache.invalidate_schema(db_url, schema_fp)
+        # Requests differing only in quoted/numeric literals share one entry;
+        # the cached SQL template is re-filled with this request's literals.
+        nl_template, literals = normalize_nl_literals(nl_query)
+        template_key = build_cache_key_fp(nl_template, schema_fp)
+        exact_key = build_cache_key_fp(nl_query, schema_fp) if literals else template_key
+        cached = self._cache.get(template_key, schema_fp)
+        cached_sql = render_sql_template(cached, literals) if cached else None
+        if not cached_sql and literals:
+            # Translations that could not be templated are stored verbatim.
+            cached_sql = self._cache.get(exact_key, schema_fp)
+        if cached_sql:
             return {
-                "sql": cached,
+                "sql": cached_sql,
                 "schema": schema,
                 "dialect": dialect,
                 "schema_ms": schema_ms,
@@ -59,9 +77,17 @@ class TranslateUseCase:
 
         llm_start = time.perf_counter()
         translator = self._translator_provider()
-        sql = await translator.translate(nl_query, tables, dialect)
+        # Large schemas are cut down to the tables the request mentions, which
+        # keeps prompt size (and LLM latency) from growing with the database.
+        sql = await translator.translate(
+            nl_query, prune_schema(nl_query, schema), dialect
+        )
         llm_ms = round((time.perf_counter() - llm_start) * 1000, 2)
-        self._cache.set(cache_key, sql)
+        template = to_sql_template(sql, literals)
+        if template is not None:
+            self._cache.set(template_key, template, schema_fp)
+        else:
+            self._cache.set(exact_key, sql, schema_fp)
         return {
             "sql": sql,
             "schema": schema,
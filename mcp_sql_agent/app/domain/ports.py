@@ -1,12 +1,15 @@
-from typing import Any, Protocol, runtime_checkable
+from collections.abc import Sequence
+from typing import Any, Protocol
 
 
-@runtime_checkable
 class SqlAdapter(Protocol):
     """Database adapter abstraction for querying and schema inspection."""
     async def query(self, sql: str) -> list[dict]:
         ...
 
+    async def query_rows(self, sql: str) -> tuple[list[str], list[Sequence]]:
+        ...
+
     async def execute_write(self, sql: str) -> int:
         ...
 
@@ -17,14 +20,12 @@ class SqlAdapter(Protocol):
         ...
 
 
-@runtime_checkable
 class LlmTranslator(Protocol):
     """Translator abstraction for NL -> SQL generation."""
     async def translate(self, nl_query: str, schema: dict, dialect: str) -> str:
         ...
 
 
-@runtime_checkable
 class SqlAdapterProvider(Protocol):
     """Provider abstraction for DB adapters and DB-level metadata."""
     def get_adapter(self, db_url: str | None = None) -> SqlAdapter:
@@ -33,6 +34,9 @@ class SqlAdapterProvider(Protocol):
     async def get_schema(self, db_url: str | None = None) -> dict:
         ...
 
+    def peek_schema(self, db_url: str | None = None) -> dict | None:
+        ...
+
     async def list_tables(self, db_url: str | None = None) -> dict:
         ...
 
@@ -41,3 +45,6 @@ class SqlAdapterProvider(Protocol):
 
     async def db_debug(self) -> dict:
         ...
+
+    async def aclose(self) -> None:
+        ...
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 from pathlib import Path
 import os
+import re
 
 
 @dataclass(frozen=True)
@@ -10,10 +11,19 @@ class Settings:
     openai_api_key: str
     openai_model: str
     log_level: str
+    openai_max_concurrency: int = 8
+    openai_rpm_limit: int | None = None
+    openai_tpm_limit: int | None = None
 
 
 _SETTINGS: Settings | None = None
 
+# One "KEY=value" assignment per line; comment lines, blank lines, and lines
+# without "=" do not match. Surrounding whitespace (incl. \r) is excluded.
+_ENV_LINE_RE = re.compile(
+    r"^[^\S\n]*([^#\s=][^=\n]*?)[^\S\n]*=[^\S\n]*(.*?)[^\S\n]*$", re.MULTILINE
+)
+
 
 def load_env(env_path: Path) -> None:
     """Load environment variables from a .env file without overriding existing ones.
@@ -26,16 +36,10 @@ def load_env(env_path: Path) -> None:
     if not env_path.exists():
         return
 
-    for raw_line in env_path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip()
-        value = value.strip().strip('"').strip("'")
+    text = env_path.read_text(encoding="utf-8")
+    for key, value in _ENV_LINE_RE.findall(text):
         # Do not override process env vars to keep runtime config explicit.
-        if key and key not in os.environ:
-            os.environ[key] = value
+        os.environ.setdefault(key, value.strip('"').strip("'"))
 
 
 def get_settings() -> Settings:
@@ -58,11 +62,17 @@ def get_settings() -> Settings:
     openai_api_key = os.getenv("OPENAI_API_KEY", "")
     openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     log_level = os.getenv("LOG_LEVEL", "INFO")
+    openai_max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "8"))
+    openai_rpm_limit = int(os.getenv("OPENAI_RPM_LIMIT", "0")) or None
+    openai_tpm_limit = int(os.getenv("OPENAI_TPM_LIMIT", "0")) or None
 
     _SETTINGS = Settings(
         db_url=db_url,
         openai_api_key=openai_api_key,
         openai_model=openai_model,
         log_level=log_level,
+        openai_max_concurrency=openai_max_concurrency,
+        openai_rpm_limit=openai_rpm_limit,
+        openai_tpm_limit=openai_tpm_limit,
     )
     return _SETTINGS
@@ -1,8 +1,102 @@
-from sqlalchemy import inspect, text
+from collections.abc import Sequence
+from functools import lru_cache
+
+from sqlalchemy import TextClause, inspect, text
 from sqlalchemy.engine.url import make_url
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 
 
+# Namespace of current_schema(), the only schema introspected on PostgreSQL.
+_PG_CURRENT_NAMESPACE = (
+    "(SELECT oid FROM pg_catalog.pg_namespace WHERE nspname = current_schema())"
+)
+
+# Cheap probes whose result changes whenever DDL runs, keyed by dialect name.
+_SCHEMA_VERSION_SQL = {
+    # Bumped by SQLite on every schema change.
+    "sqlite": "PRAGMA schema_version",
+    # Hashes of what get_schema reads: the column names and types and the
+    # foreign keys of tables in current_schema(). Temp tables, ANALYZE, other
+    # schemas and xmin wraparound leave it unchanged. It still changes on DDL
+    # the payload does not show: renaming a foreign-key constraint, or
+    # dropping and re-adding a column that a foreign key uses (new attnum).
+    "postgresql": (
+        "SELECT (SELECT md5(coalesce(string_agg("
+        "c.relname || '.' || a.attname || ' ' || a.atttypid || ' ' || a.atttypmod,"
+        " ',' ORDER BY c.relname, a.attnum), ''))"
+        " FROM pg_catalog.pg_class AS c"
+        " JOIN pg_catalog.pg_attribute AS a ON a.attrelid = c.oid"
+        " WHERE c.relnamespace = " + _PG_CURRENT_NAMESPACE +
+        " AND c.relkind IN ('r', 'p') AND a.attnum > 0 AND NOT a.attisdropped),"
+        " (SELECT md5(coalesce(string_agg("
+        "k.conname || ' ' || k.conrelid::regclass::text || ' ' || k.conkey::text"
+        " || ' ' || k.confrelid::regclass::text || ' ' || k.confkey::text,"
+        " ',' ORDER BY k.conrelid::regclass::text, k.conname), ''))"
+        " FROM pg_catalog.pg_constraint AS k"
+        " WHERE k.connamespace = " + _PG_CURRENT_NAMESPACE +
+        " AND k.contype = 'f')"
+    ),
+}
+
+# One columns query and one foreign-key query per dialect, replacing the
+# per-table Inspector calls (two round trips per table).
+_SCHEMA_COLUMNS_SQL = {
+    "sqlite": (
+        "SELECT m.name, p.name, p.type"
+        " FROM sqlite_master AS m JOIN pragma_table_info(m.name) AS p"
+        " WHERE m.type = 'table' AND substr(m.name, 1, 7) != 'sqlite_'"
+        " ORDER BY m.name, p.cid"
+    ),
+    # format_type keeps length, precision and array dimensions, e.g.
+    # "character varying(20)", "numeric(10,2)", "integer[]"; the
+    # information_schema data_type column drops them.
+    "postgresql": (
+        "SELECT c.relname, a.attname, pg_catalog.format_type(a.atttypid, a.atttypmod)"
+        " FROM pg_catalog.pg_class AS c"
+        " JOIN pg_catalog.pg_attribute AS a ON a.attrelid = c.oid"
+        " WHERE c.relnamespace = " + _PG_CURRENT_NAMESPACE +
+        " AND c.relkind IN ('r', 'p') AND a.attnum > 0 AND NOT a.attisdropped"
+        " ORDER BY c.relname, a.attnum"
+    ),
+}
+# Rows: (table, constraint id, column, referred table, referred column).
+_SCHEMA_FOREIGN_KEYS_SQL = {
+    "sqlite": (
+        "SELECT m.name, f.id, f.\"from\", f.\"table\","
+        " COALESCE(f.\"to\", (SELECT r.name FROM pragma_table_info(f.\"table\") AS r"
+        " WHERE r.pk = f.seq + 1))"
+        " FROM sqlite_master AS m JOIN pragma_foreign_key_list(m.name) AS f"
+        " WHERE m.type = 'table'"
+        " ORDER BY m.name, f.id, f.seq"
+    ),
+    "postgresql": (
+        "SELECT k.table_name, k.constraint_name, k.column_name,"
+        " u.table_name, u.column_name"
+        " FROM information_schema.referential_constraints AS rc"
+        " JOIN information_schema.key_column_usage AS k"
+        " ON k.constraint_schema = rc.constraint_schema"
+        " AND k.constraint_name = rc.constraint_name"
+        " JOIN information_schema.key_column_usage AS u"
+        " ON u.constraint_schema = rc.unique_constraint_schema"
+        " AND u.constraint_name = rc.unique_constraint_name"
+        " AND u.ordinal_position = k.position_in_unique_constraint"
+        " WHERE k.table_schema = current_schema()"
+        " ORDER BY k.table_name, k.constraint_name, k.ordinal_position"
+    ),
+}
+
+
+@lru_cache(maxsize=1024)
+def _text(sql: str) -> TextClause:
+    """Return a reusable TextClause for sql.
+
+    text() scans the string for bind parameters on every call; the clause is
+    immutable and dialect-independent, so repeated statements share one.
+    """
+    return text(sql)
+
+
 class SQLAlchemyAdapter:
     """SQLAlchemy-backed implementation of the SqlAdapter protocol.
 
@@ -28,9 +122,26 @@ class SQLAlchemyAdapter:
             List of row dicts.
         """
         async with self.engine.connect() as conn:
-            result = await conn.execute(text(sql))
-            rows = result.mappings().all()
-            return [dict(r) for r in rows]
+            result = await conn.execute(_text(sql))
+            # Zipping plain row tuples with the keys is several times faster
+            # than building a RowMapping per row and copying it into a dict.
+            keys = tuple(result.keys())
+            return [dict(zip(keys, row)) for row in result.fetchall()]
+
+    async def query_rows(self, sql: str) -> tuple[list[str], list[Sequence]]:
+        """Execute a read query and return column names and raw row tuples.
+
+        Skips building a dict per row, for callers that serialize rows
+        positionally (e.g. CSV output).
+
+        Args:
+            sql: SQL to execute (typically SELECT/CTE).
+        Returns:
+            Tuple of (column names, rows in column order).
+        """
+        async with self.engine.connect() as conn:
+            result = await conn.execute(_text(sql))
+            return list(result.keys()), result.fetchall()
 
     async def execute_write(self, sql: str) -> int:
         """Execute a write query and return affected row count.
@@ -41,7 +152,7 @@ class SQLAlchemyAdapter:
             Number of affected rows.
         """
         async with self.engine.begin() as conn:
-            result = await conn.execute(text(sql))
+            result = await conn.execute(_text(sql))
             return int(result.rowcount or 0)
 
     async def get_schema(self) -> dict:
@@ -50,43 +161,111 @@ class SQLAlchemyAdapter:
         Returns:
             Dict with tables, columns, and foreign key metadata.
         """
-        def _run(sync_conn) -> dict:
-            insp = inspect(sync_conn)
-            schema = {}
-            foreign_keys = []
-            for table in insp.get_table_names():
-                cols = insp.get_columns(table)
-                schema[table] = [
-                    {"name": c["name"], "type": str(c["type"])} for c in cols
-                ]
-                for fk in insp.get_foreign_keys(table):
-                    if not fk.get("referred_table") or not fk.get(
-                        "constrained_columns"
-                    ):
-                        continue
-                    foreign_keys.append(
-                        {
-                            "table": table,
-                            "columns": fk.get("constrained_columns", []),
-                            "referred_table": fk.get("referred_table"),
-                            "referred_columns": fk.get("referred_columns", []),
-                        }
-                    )
-            return {"tables": schema, "foreign_keys": foreign_keys}
+        dialect = self.engine.dialect.name
+        columns_sql = _SCHEMA_COLUMNS_SQL.get(dialect)
+        if columns_sql is None:
+            run = _inspect_schema
+        else:
+            fks_sql = _SCHEMA_FOREIGN_KEYS_SQL[dialect]
+
+            def run(sync_conn) -> dict:
+                return _query_schema(sync_conn, columns_sql, fks_sql)
 
         async with self.engine.connect() as conn:
-            payload = await conn.run_sync(_run)
+            payload = await conn.run_sync(run)
         payload["dialect"] = self.engine.dialect.name
         return payload
 
+    async def get_schema_version(self) -> str | None:
+        """Return a token that changes when the database schema changes.
+
+        Returns:
+            Opaque version string, or None when the dialect has no cheap probe
+            or the probe fails.
+        """
+        probe = _SCHEMA_VERSION_SQL.get(self.engine.dialect.name)
+        if probe is None:
+            return None
+        try:
+            async with self.engine.connect() as conn:
+                result = await conn.exec_driver_sql(probe)
+                row = result.first()
+        except SQLAlchemyError:
+            return None
+        return None if row is None else ":".join(str(v) for v in row)
+
     async def get_dialect(self) -> str:
         """Return the SQL dialect name used by the engine."""
         return self.engine.dialect.name
 
 
+def _query_schema(sync_conn, columns_sql: str, fks_sql: str) -> dict:
+    """Build the schema payload from two bulk catalog queries.
+
+    Args:
+        sync_conn: Sync connection handed over by AsyncConnection.run_sync.
+        columns_sql: Query yielding (table, column, type) rows.
+        fks_sql: Query yielding (table, constraint, column, referred table,
+            referred column) rows, ordered by table and constraint.
+    Returns:
+        Dict with tables and foreign key metadata.
+    """
+    schema: dict[str, list[dict]] = {}
+    for table, column, col_type in sync_conn.exec_driver_sql(columns_sql):
+        schema.setdefault(table, []).append({"name": column, "type": col_type})
+
+    foreign_keys: list[dict] = []
+    current = None
+    for table, constraint, column, referred_table, referred_column in (
+        sync_conn.exec_driver_sql(fks_sql)
+    ):
+        if current is None or current[0] != (table, constraint):
+            fk = {
+                "table": table,
+                "columns": [],
+                "referred_table": referred_table,
+                "referred_columns": [],
+            }
+            foreign_keys.append(fk)
+            current = ((table, constraint), fk)
+        current[1]["columns"].append(column)
+        if referred_column is not None:
+            current[1]["referred_columns"].append(referred_column)
+    return {"tables": schema, "foreign_keys": foreign_keys}
+
+
+def _inspect_schema(sync_conn) -> dict:
+    """Build the schema payload through the SQLAlchemy Inspector.
+
+    Used for dialects without a bulk catalog query; issues a columns and a
+    foreign-key lookup per table.
+    """
+    insp = inspect(sync_conn)
+    schema = {}
+    foreign_keys = []
+    for table in insp.get_table_names():
+        cols = insp.get_columns(table)
+        schema[table] = [{"name": c["name"], "type": str(c["type"])} for c in cols]
+        for fk in insp.get_foreign_keys(table):
+            if not fk.get("referred_table") or not fk.get("constrained_columns"):
+                continue
+            foreign_keys.append(
+                {
+                    "table": table,
+                    "columns": fk.get("constrained_columns", []),
+                    "referred_table": fk.get("referred_table"),
+                    "referred_columns": fk.get("referred_columns", []),
+                }
+            )
+    return {"tables": schema, "foreign_keys": foreign_keys}
+
+
+@lru_cache(maxsize=64)
 def _normalize_db_url(db_url: str) -> str:
     """Map sync SQLAlchemy URLs to async driver URLs when needed.
 
+    Memoized: make_url parsing is not free and the same URLs recur.
+
     Args:
         db_url: SQLAlchemy URL from config.
     Returns:
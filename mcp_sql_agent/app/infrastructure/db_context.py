@@ -1,4 +1,8 @@
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
+import asyncio
+import logging
 import os
 import time
 
@@ -6,14 +10,39 @@ from mcp_sql_agent.app.infrastructure.db.sqlalchemy_adapter import SQLAlchemyAda
 from mcp_sql_agent.app.infrastructure.config import get_settings
 
 
+logger = logging.getLogger(__name__)
+
+# Fraction of the TTL, at the end of an entry's life, during which a hit
+# schedules a background re-introspection instead of waiting for expiry.
+_REFRESH_AHEAD = 0.2
+
+
+@lru_cache(maxsize=1)
+def _demo_db_path() -> Path:
+    """Return the bundled demo database path (resolved once; it never moves)."""
+    return Path(__file__).resolve().parents[1] / "demo.db"
+
+
 class DbContext:
     """Owns DB adapter instances and schema cache for a default DB URL."""
     def __init__(self, db_url: str):
         """Initialize context with a default DB URL and adapter."""
         self._db_url = db_url
         self._adapter = SQLAlchemyAdapter(db_url)
-        self._schema_cache: dict[str, tuple[dict, float]] = {}
+        # Adapters for db_url overrides, reused so each URL keeps one engine/pool.
+        self._adapters: OrderedDict[str, SQLAlchemyAdapter] = OrderedDict()
+        self._max_adapters = 16
+        # Strong references to fire-and-forget tasks until they finish; the
+        # event loop only holds tasks weakly.
+        self._background_tasks: set[asyncio.Task] = set()
+        # cache key -> (schema, monotonic expiry, schema version at
+        # introspection, monotonic time of the last version probe)
+        self._schema_cache: dict[str, tuple[dict, float, str | None, float]] = {}
         self._schema_cache_ttl_seconds = 60
+        # Hits within this many seconds of the last probe skip the probe, so
+        # bursts of calls pay one catalog round trip instead of one each.
+        self._schema_probe_interval_seconds = 2.0
+        self._refresh_tasks: dict[str, asyncio.Task] = {}
 
     @property
     def db_url(self) -> str:
@@ -23,31 +52,86 @@ class DbContext:
     def get_adapter(self, db_url: str | None = None) -> SQLAlchemyAdapter:
         """Return an adapter for the requested DB URL or the default.
 
+        Override URLs get one cached adapter each (least recently used beyond
+        the cap are disposed), so repeated requests share an engine and pool.
+
         Args:
             db_url: Optional override for the default DB URL.
         Returns:
             SQLAlchemyAdapter bound to the requested database.
         """
-        if not db_url:
+        if not db_url or db_url == self._db_url:
             return self._adapter
-        return SQLAlchemyAdapter(db_url)
+        adapter = self._adapters.get(db_url)
+        if adapter is not None:
+            self._adapters.move_to_end(db_url)
+            return adapter
+        adapter = self._adapters[db_url] = SQLAlchemyAdapter(db_url)
+        if len(self._adapters) > self._max_adapters:
+            _, evicted = self._adapters.popitem(last=False)
+            self._dispose_later(evicted)
+        return adapter
 
     async def get_schema(self, db_url: str | None = None) -> dict:
         """Return schema metadata, using cached results when available.
 
+        A cached schema is reused while it is within the TTL and the adapter's
+        schema-version probe reports no DDL since it was introspected. The
+        probe is skipped when it last ran within the probe interval, so DDL
+        may go unnoticed for up to that long. Hits near the end of the TTL
+        return the cached schema and refresh it in the background, so callers
+        rarely wait on introspection.
+
         Args:
             db_url: Optional override for the default DB URL.
         Returns:
             Dict with tables, columns, and relationship metadata.
         """
         cache_key = self._schema_cache_key(db_url)
-        cached = self._get_cached_schema(cache_key)
+        adapter = self.get_adapter(db_url)
+        entry = self._schema_cache.get(cache_key)
+        now = time.monotonic()
+        if (
+            entry is not None
+            and now < entry[1]
+            and now - entry[3] < self._schema_probe_interval_seconds
+        ):
+            self._maybe_refresh(cache_key, adapter)
+            return entry[0]
+        version = await adapter.get_schema_version()
+        cached = self._get_cached_schema(cache_key, version)
         if cached is not None:
+            self._maybe_refresh(cache_key, adapter)
             return cached
-        schema = await self.get_adapter(db_url).get_schema()
-        self._set_cached_schema(cache_key, schema)
+        schema = await adapter.get_schema()
+        self._set_cached_schema(cache_key, schema, version)
         return schema
 
+    def peek_schema(self, db_url: str | None = None) -> dict | None:
+        """Return the cached schema without probing the database.
+
+        Unlike get_schema this never awaits I/O: it returns the cached schema
+        while it is within the TTL (DDL since the last probe is only noticed
+        by the next get_schema call), and otherwise returns None and starts a
+        background introspection so later calls find the cache warm.
+
+        Args:
+            db_url: Optional override for the default DB URL.
+        Returns:
+            Cached schema dict, or None when the cache is cold or expired.
+        """
+        cache_key = self._schema_cache_key(db_url)
+        adapter = self.get_adapter(db_url)
+        cached = self._schema_cache.get(cache_key)
+        if cached is not None and time.monotonic() >= cached[1]:
+            del self._schema_cache[cache_key]
+            cached = None
+        if cached is None:
+            self._start_refresh(cache_key, adapter)
+            return None
+        self._maybe_refresh(cache_key, adapter)
+        return cached[0]
+
     async def list_tables(self, db_url: str | None = None) -> dict:
         """Return a dict of table names for the requested database.
 
@@ -67,16 +151,44 @@ class DbContext:
         Returns:
             Dict containing updated configuration metadata.
         Side Effects:
-            Resets schema cache and replaces the default adapter.
+            Resets schema cache, cancelling in-flight background refreshes,
+            and replaces the default adapter; the old
+            default's pool is disposed unless the URL is unchanged.
         """
+        if db_url != self._db_url:
+            previous = self._adapter
+            # Promote a cached override adapter rather than opening a new pool.
+            adapter = self._adapters.pop(db_url, None)
+            self._adapter = adapter or SQLAlchemyAdapter(db_url)
+            self._dispose_later(previous)
         self._db_url = db_url
-        self._adapter = SQLAlchemyAdapter(db_url)
         self._schema_cache.clear()
+        for task in self._refresh_tasks.values():
+            # Their results belong to the old cache; cancel, but keep them
+            # referenced until the cancellation is processed.
+            task.cancel()
+            self._keep_until_done(task)
+        self._refresh_tasks.clear()
         return {"db_url": self._db_url}
 
+    async def aclose(self) -> None:
+        """Cancel background refreshes and close every adapter's pool.
+
+        Side Effects:
+            Disposes the default and cached override engines; they reconnect
+            on next use.
+        """
+        for task in self._refresh_tasks.values():
+            task.cancel()
+        pending = [*self._refresh_tasks.values(), *self._background_tasks]
+        self._refresh_tasks.clear()
+        await asyncio.gather(*pending, return_exceptions=True)
+        for adapter in (self._adapter, *self._adapters.values()):
+            await adapter.engine.dispose()
+
     async def db_debug(self) -> dict:
         """Return basic diagnostic metadata for the DB context."""
-        db_path = Path(__file__).resolve().parents[1] / "demo.db"
+        db_path = _demo_db_path()
         return {
             "cwd": os.getcwd(),
             "db_url": self._db_url,
@@ -84,24 +196,78 @@ class DbContext:
             "db_exists": db_path.exists(),
         }
 
+    def _dispose_later(self, adapter: SQLAlchemyAdapter) -> None:
+        """Close an evicted adapter's connection pool in the background."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop to dispose on; the pool is closed when collected.
+        self._keep_until_done(loop.create_task(adapter.engine.dispose()))
+
+    def _keep_until_done(self, task: asyncio.Task) -> None:
+        """Hold a strong reference to task until it completes."""
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def _maybe_refresh(self, cache_key: str, adapter: SQLAlchemyAdapter) -> None:
+        """Start one background refresh when a cached schema nears expiry."""
+        expires_at = self._schema_cache[cache_key][1]
+        refresh_at = expires_at - self._schema_cache_ttl_seconds * _REFRESH_AHEAD
+        if time.monotonic() >= refresh_at:
+            self._start_refresh(cache_key, adapter)
+
+    def _start_refresh(self, cache_key: str, adapter: SQLAlchemyAdapter) -> None:
+        """Start a background schema refresh unless one is already running."""
+        if cache_key in self._refresh_tasks:
+            return
+        task = asyncio.get_running_loop().create_task(
+            self._refresh_schema(cache_key, adapter)
+        )
+        self._refresh_tasks[cache_key] = task
+
+    async def _refresh_schema(self, cache_key: str, adapter: SQLAlchemyAdapter) -> None:
+        """Re-introspect a schema and replace its cache entry (background task)."""
+        try:
+            version = await adapter.get_schema_version()
+            schema = await adapter.get_schema()
+        except Exception:
+            # The entry simply expires; the next caller introspects inline.
+            logger.warning("background schema refresh failed", exc_info=True)
+            schema = None
+        if self._refresh_tasks.get(cache_key) is not asyncio.current_task():
+            return  # Superseded by set_db_url; drop the result.
+        del self._refresh_tasks[cache_key]
+        if schema is not None:
+            self._set_cached_schema(cache_key, schema, version)
+
     def _schema_cache_key(self, db_url: str | None) -> str:
         """Return the cache key for schema lookups."""
         return db_url or self._db_url
 
-    def _get_cached_schema(self, cache_key: str) -> dict | None:
-        """Return cached schema when fresh, otherwise None."""
+    def _get_cached_schema(self, cache_key: str, version: str | None) -> dict | None:
+        """Return cached schema when fresh and at version, otherwise None.
+
+        A hit records the probe time, restarting the probe interval.
+        """
         cached = self._schema_cache.get(cache_key)
         if cached is None:
             return None
-        schema, ts = cached
-        if time.time() - ts > self._schema_cache_ttl_seconds:
-            self._schema_cache.pop(cache_key, None)
+        schema, expires_at, cached_version, _ = cached
+        now = time.monotonic()
+        if now >= expires_at or version != cached_version:
+            del self._schema_cache[cache_key]
             return None
+        self._schema_cache[cache_key] = (schema, expires_at, cached_version, now)
         return schema
 
-    def _set_cached_schema(self, cache_key: str, schema: dict) -> None:
-        """Store schema in cache with a timestamp."""
-        self._schema_cache[cache_key] = (schema, time.time())
+    def _set_cached_schema(
+        self, cache_key: str, schema: dict, version: str | None
+    ) -> None:
+        """Store schema in cache with its expiry time and schema version."""
+        # Monotonic so wall-clock adjustments cannot extend or cut the TTL.
+        now = time.monotonic()
+        expires_at = now + self._schema_cache_ttl_seconds
+        self._schema_cache[cache_key] = (schema, expires_at, version, now)
 
 
 _DEFAULT_CONTEXT: DbContext | None = None
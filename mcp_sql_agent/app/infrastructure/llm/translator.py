@@ -1,8 +1,68 @@
+import asyncio
+import importlib.util
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Any, Dict
 
 from mcp_sql_agent.app.domain.ports import LlmTranslator
 
 
+# Connection pool sizing for concurrent translations; the SDK default keeps
+# too few keep-alive connections once several ask_db calls run at once.
+_MAX_CONNECTIONS = 100
+_MAX_KEEPALIVE_CONNECTIONS = 100
+# Fail fast on connect; completions themselves may legitimately take a while.
+_CONNECT_TIMEOUT_SECONDS = 5.0
+_REQUEST_TIMEOUT_SECONDS = 60.0
+
+# Requests in flight at once; beyond this, calls queue locally instead of
+# piling onto the API and tripping rate limits.
+_DEFAULT_MAX_CONCURRENCY = 8
+_MAX_COMPLETION_TOKENS = 512
+# Rough prompt-token estimate for TPM pacing (OpenAI's ~4 chars per token).
+_CHARS_PER_TOKEN = 4
+
+_SCHEMA_TEXT_CACHE_SIZE = 8
+# id(schema) -> (schema, rendered text); holding the schema keeps its id stable.
+_schema_texts: OrderedDict[int, tuple[dict, str]] = OrderedDict()
+
+
+def _schema_text(schema: Dict[str, Any]) -> str:
+    """Return the prompt rendering of schema, memoized per schema object.
+
+    Schemas come from the provider's cache and are not mutated, so every
+    translation against the same schema reuses one rendered string.
+    """
+    schema_id = id(schema)
+    cached = _schema_texts.get(schema_id)
+    if cached is not None and cached[0] is schema:
+        _schema_texts.move_to_end(schema_id)
+        return cached[1]
+    # One "table(column TYPE, ...)" line per table: far fewer tokens than the
+    # nested dict repr, and unambiguous even when types contain commas.
+    lines = []
+    for table, columns in schema.items():
+        cols = ", ".join(f"{c['name']} {c['type']}".rstrip() for c in columns)
+        lines.append(f"{table}({cols})")
+    text = "\n".join(lines)
+    _schema_texts[schema_id] = (schema, text)
+    if len(_schema_texts) > _SCHEMA_TEXT_CACHE_SIZE:
+        _schema_texts.popitem(last=False)
+    return text
+
+
+@lru_cache(maxsize=16)
+def _prompt_head(dialect: str) -> str:
+    """Return the fixed instructions that open every prompt for a dialect."""
+    return (
+        "You are a SQL generator.\n"
+        "Return ONLY the SQL query, no markdown, no explanation.\n"
+        f"Dialect: {dialect}\n\n"
+        "Schema:\n"
+    )
+
+
 def _build_prompt(nl_query: str, schema: Dict[str, Any], dialect: str) -> str:
     """Build the LLM prompt for NL -> SQL translation.
 
@@ -13,29 +73,76 @@ def _build_prompt(nl_query: str, schema: Dict[str, Any], dialect: str) -> str:
     Returns:
         Prompt string to send to the LLM.
     """
-    return (
-        "You are a SQL generator.\n"
-        "Return ONLY the SQL query, no markdown, no explanation.\n"
-        f"Dialect: {dialect}\n\n"
-        "Schema:\n"
-        f"{schema}\n\n"
-        "User request:\n"
-        f"{nl_query}\n"
+    return "".join(
+        (
+            _prompt_head(dialect),
+            _schema_text(schema),
+            "\n\nUser request:\n",
+            nl_query,
+            "\n",
+        )
     )
 
 
+class _RateLimiter:
+    """Token bucket allowing per_minute units, in bursts of up to that many."""
+    def __init__(self, per_minute: int) -> None:
+        """Start with a full bucket of per_minute tokens."""
+        self._rate = per_minute / 60.0
+        self._capacity = float(per_minute)
+        self._tokens = self._capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until amount units are available, then consume them.
+
+        Amounts above the bucket size are capped to it, so an oversized
+        request waits for a full bucket instead of forever.
+        """
+        amount = min(amount, self._capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self._rate)
+
+
 class OpenAiTranslator(LlmTranslator):
-    """OpenAI-backed translator for NL -> SQL."""
-    def __init__(self, api_key: str, model: str) -> None:
+    """OpenAI-backed translator for NL -> SQL.
+
+    Concurrent calls with the same prompt share one completion, at most
+    max_concurrency requests are in flight, and optional requests- and
+    tokens-per-minute budgets pace calls locally instead of surfacing 429
+    errors (the SDK still retries any 429 that slips through, with backoff).
+    """
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        max_concurrency: int = _DEFAULT_MAX_CONCURRENCY,
+        rpm_limit: int | None = None,
+        tpm_limit: int | None = None,
+    ) -> None:
         """Initialize the OpenAI client and validate credentials.
 
         Args:
             api_key: OpenAI API key.
             model: OpenAI model identifier.
+            max_concurrency: Max chat completions in flight at once.
+            rpm_limit: Optional requests-per-minute budget for the model.
+            tpm_limit: Optional tokens-per-minute budget (prompt + completion).
         Raises:
             RuntimeError: When the OpenAI SDK is missing or API key is blank.
         """
         try:
+            import httpx
             from openai import AsyncOpenAI
         except Exception as exc:  # pragma: no cover - handled as runtime guidance
             raise RuntimeError(
@@ -46,8 +153,28 @@ class OpenAiTranslator(LlmTranslator):
         if not cleaned:
             raise RuntimeError("OPENAI_API_KEY is not set.")
 
-        self._client = AsyncOpenAI(api_key=cleaned)
+        self._http_client = httpx.AsyncClient(
+            # With h2 (the "speedups" extra) concurrent completions share one
+            # multiplexed connection instead of opening one TLS session each.
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=_MAX_CONNECTIONS,
+                max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(
+                _REQUEST_TIMEOUT_SECONDS, connect=_CONNECT_TIMEOUT_SECONDS
+            ),
+        )
+        self._client = AsyncOpenAI(api_key=cleaned, http_client=self._http_client)
         self._model = model
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._limiter = _RateLimiter(rpm_limit) if rpm_limit else None
+        self._token_limiter = _RateLimiter(tpm_limit) if tpm_limit else None
+        self._inflight: dict[str, asyncio.Task[str]] = {}
+
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client held by this translator."""
+        await self._client.close()
 
     async def translate(self, nl_query: str, schema: Dict[str, Any], dialect: str) -> str:
         """Translate a natural language query into SQL.
@@ -60,10 +187,27 @@ class OpenAiTranslator(LlmTranslator):
             SQL string generated by the LLM.
         """
         prompt = _build_prompt(nl_query, schema, dialect)
-        response = await self._client.chat.completions.create(
-            model=self._model,
-            temperature=0,
-            max_tokens=512,
-            messages=[{"role": "user", "content": prompt}],
-        )
+        task = self._inflight.get(prompt)
+        if task is None:
+            task = asyncio.create_task(self._complete(prompt))
+            self._inflight[prompt] = task
+            task.add_done_callback(lambda _: self._inflight.pop(prompt, None))
+        # Shielded so one caller's cancellation does not fail the others.
+        return await asyncio.shield(task)
+
+    async def _complete(self, prompt: str) -> str:
+        """Send one chat completion, within the concurrency and rate limits."""
+        async with self._slots:
+            if self._limiter is not None:
+                await self._limiter.acquire()
+            if self._token_limiter is not None:
+                await self._token_limiter.acquire(
+                    len(prompt) // _CHARS_PER_TOKEN + _MAX_COMPLETION_TOKENS
+                )
+            response = await self._client.chat.completions.create(
+                model=self._model,
+                temperature=0,
+                max_tokens=_MAX_COMPLETION_TOKENS,
+                messages=[{"role": "user", "content": prompt}],
+            )
         return (response.choices[0].message.content or "").strip()
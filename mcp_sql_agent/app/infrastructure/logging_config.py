@@ -1,27 +1,151 @@
+import atexit
+import io
 import json
 import logging
+import logging.handlers
+import queue
+import sys
 from datetime import datetime, timezone
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the installed extras
+    orjson = None
+
 
 class JsonFormatter(logging.Formatter):
     """Format log records as JSON payloads."""
+    # (epoch second, "YYYY-MM-DDTHH:MM:SS") for the last second formatted;
+    # replaced as one tuple so concurrent handlers never see a torn pair.
+    _ts_cache: tuple[int, str] = (-1, "")
+
+    def _timestamp(self, created: float) -> str:
+        """Return the UTC ISO-8601 timestamp for a record creation time.
+
+        The date/time part is rendered once per second; only the
+        microseconds are formatted per record.
+        """
+        # Round the fraction on its own, as datetime.fromtimestamp does.
+        sec = int(created)
+        micros = round((created - sec) * 1e6)
+        if micros == 1_000_000:
+            sec, micros = sec + 1, 0
+        cached_sec, prefix = self._ts_cache
+        if sec != cached_sec:
+            utc = datetime.fromtimestamp(sec, timezone.utc)
+            prefix = utc.strftime("%Y-%m-%dT%H:%M:%S")
+            self._ts_cache = (sec, prefix)
+        return f"{prefix}.{micros:06d}+00:00"
+
     def format(self, record: logging.LogRecord) -> str:
         """Serialize a log record into JSON."""
+        msg = record.msg
+        # Plain string messages without args (the common case) skip getMessage.
+        message = msg if type(msg) is str and not record.args else record.getMessage()
         payload = {
-            "ts": datetime.now(timezone.utc).isoformat(),
+            "ts": self._timestamp(record.created),
             "level": record.levelname,
             "logger": record.name,
-            "message": record.getMessage(),
+            "message": message,
         }
         if record.exc_info:
-            payload["exception"] = self.formatException(record.exc_info)
-        return json.dumps(payload, ensure_ascii=True)
+            # Cached on the record like logging.Formatter does, so a record
+            # handled by several formatters walks its traceback once.
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            payload["exception"] = record.exc_text
+        if orjson is not None:
+            # orjson cannot escape non-ASCII; such (rare) records take the
+            # stdlib path so log lines stay ASCII-safe on any console encoding.
+            data = orjson.dumps(payload)
+            if data.isascii():
+                return data.decode("ascii")
+        return json.dumps(payload, ensure_ascii=True, separators=(",", ":"))
+
+
+class _BatchFlushHandler(logging.StreamHandler):
+    """StreamHandler that flushes only once the listener's queue is drained."""
+    def __init__(self, stream: io.TextIOBase, pending: queue.SimpleQueue) -> None:
+        """Write to stream, deferring flushes while pending still holds records."""
+        super().__init__(stream)
+        self._pending = pending
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write one pre-formatted record, flushing at the end of a burst."""
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if self._pending.empty():
+                self.flush()
+        except RecursionError:  # pragma: no cover - mirrors StreamHandler.emit
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def _stop_listener() -> None:
+    """Drain queued records to the stream and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.flush()
+            # Detach so collecting the wrapper does not close stderr's buffer.
+            stream = handler.stream
+            if isinstance(stream, io.TextIOWrapper) and stream is not sys.stderr:
+                stream.detach()
+        _listener = None
+
+
+def _buffered_stderr() -> io.TextIOBase:
+    """Return a block-buffered text stream over stderr's binary buffer."""
+    raw = getattr(sys.stderr, "buffer", None)
+    if raw is None:  # pragma: no cover - stderr replaced by a text-only stream
+        return sys.stderr
+    return io.TextIOWrapper(
+        raw,
+        encoding="utf-8",
+        errors="backslashreplace",
+        write_through=False,
+    )
 
 
 def configure_logging(level: str) -> None:
-    """Configure root logging with JSON formatting at the given level."""
-    handler = logging.StreamHandler()
-    handler.setFormatter(JsonFormatter())
+    """Configure root logging with JSON formatting at the given level.
+
+    Records are formatted on the calling thread and handed to a background
+    QueueListener, which writes them to buffered stderr (stdout carries the
+    MCP stdio transport) and flushes once per burst rather than per record.
+
+    Side Effects:
+        Replaces the root handlers, (re)starts the listener thread, and
+        stops the logging module from recording caller, thread, and process
+        details that the JSON output does not use.
+    """
+    # JsonFormatter never emits caller, thread, or process fields, so skip
+    # collecting them: findCaller's stack walk is the costliest part of
+    # building a record.
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    _stop_listener()
+    pending: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(pending)
+    # prepare() stores the formatted text as the record message, so the JSON
+    # (including any traceback) is built before the record crosses threads.
+    queue_handler.setFormatter(JsonFormatter())
+    global _listener
+    _listener = logging.handlers.QueueListener(
+        pending, _BatchFlushHandler(_buffered_stderr(), pending)
+    )
+    _listener.start()
     root = logging.getLogger()
     root.setLevel(level)
-    root.handlers = [handler]
+    root.handlers = [queue_handler]
+
+
+atexit.register(_stop_listener)
@@ -1,18 +1,45 @@
+import asyncio
 import logging
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from typing import TYPE_CHECKING
 
 from mcp.server.fastmcp import FastMCP
 
 from mcp_sql_agent.app.app_container import build_sql_agent_service
-from mcp_sql_agent.app.application.sql_agent_service import SqlAgentService
+
+if TYPE_CHECKING:
+    from mcp_sql_agent.app.application.sql_agent_service import SqlAgentService
 
 
 logger = logging.getLogger(__name__)
 
-mcp = FastMCP("sql")
-_service: SqlAgentService | None = None
+_service: "SqlAgentService | None" = None
+_PONG = "pong"
+
+# Fixed leading messages of the prompts below; FastMCP validates them into
+# new Message models, so the shared dicts are never mutated.
+_SCHEMA_RESOURCE_MESSAGE = {
+    "role": "user",
+    "content": {"type": "resource", "resource": {"uri": "resource://db/schema"}},
+}
+_NL_TO_SQL_PREFIX = (
+    {
+        "role": "system",
+        "content": "You are a SQL assistant. Use the provided schema. Return only SQL.",
+    },
+    _SCHEMA_RESOURCE_MESSAGE,
+)
+_SQL_SAFETY_PREFIX = (
+    {
+        "role": "system",
+        "content": "Review the SQL for safety and performance risks. Suggest improvements.",
+    },
+    _SCHEMA_RESOURCE_MESSAGE,
+)
 
 
-def _get_service() -> SqlAgentService:
+def _get_service() -> "SqlAgentService":
     """Return the singleton SqlAgentService, lazily initialized.
 
     Side Effects:
@@ -25,7 +52,39 @@ def _get_service() -> SqlAgentService:
     return _service
 
 
-def _set_service(service: SqlAgentService) -> None:
+async def _warm_schema_cache(service: "SqlAgentService") -> None:
+    """Introspect the default DB so the first tool call hits a cached schema."""
+    try:
+        await service.get_schema()
+    except Exception:
+        # Start-up must not depend on the DB; the first call retries inline.
+        logger.warning("schema warm-up failed", exc_info=True)
+
+
+@asynccontextmanager
+async def _lifespan(_server: FastMCP) -> AsyncIterator[None]:
+    """Build the service before serving and release its clients on shutdown.
+
+    Side Effects:
+        Constructs the service during server start-up, so the first tool call
+        does not pay for it, starts a background schema warm-up, and on exit
+        stops the warm-up and closes the translator's HTTP pool and the
+        database connection pools.
+    """
+    warm_up = asyncio.create_task(_warm_schema_cache(_get_service()))
+    try:
+        yield
+    finally:
+        warm_up.cancel()
+        with suppress(asyncio.CancelledError):
+            await warm_up
+        await _get_service().aclose()
+
+
+mcp = FastMCP("sql", lifespan=_lifespan)
+
+
+def _set_service(service: "SqlAgentService") -> None:
     """Override the singleton service instance (test helper).
 
     Side Effects:
@@ -93,17 +152,7 @@ async def prompt_nl_to_sql(nl_query: str) -> list[dict]:
     Returns:
         List of MCP prompt messages including the current schema resource.
     """
-    return [
-        {
-            "role": "system",
-            "content": "You are a SQL assistant. Use the provided schema. Return only SQL.",
-        },
-        {
-            "role": "user",
-            "content": {"type": "resource", "resource": {"uri": "resource://db/schema"}},
-        },
-        {"role": "user", "content": f"Request: {nl_query}"},
-    ]
+    return [*_NL_TO_SQL_PREFIX, {"role": "user", "content": f"Request: {nl_query}"}]
 
 
 @mcp.prompt(
@@ -119,17 +168,7 @@ async def prompt_sql_safety_check(sql: str) -> list[dict]:
     Returns:
         List of MCP prompt messages including the current schema resource.
     """
-    return [
-        {
-            "role": "system",
-            "content": "Review the SQL for safety and performance risks. Suggest improvements.",
-        },
-        {
-            "role": "user",
-            "content": {"type": "resource", "resource": {"uri": "resource://db/schema"}},
-        },
-        {"role": "user", "content": f"SQL:\n{sql}"},
-    ]
+    return [*_SQL_SAFETY_PREFIX, {"role": "user", "content": f"SQL:\n{sql}"}]
 
 
 @mcp.tool()
@@ -139,7 +178,7 @@ async def ping() -> str:
     Returns:
         "pong" if the server is reachable.
     """
-    return "pong"
+    return _PONG
 
 
 @mcp.tool()
@@ -215,6 +254,7 @@ async def run_sql(
         mode: "execute" (default) or "preview"/"explain" behavior.
         preview_limit: Row cap for preview mode.
         output_format: Output format (e.g., "json", "csv", "table").
+            With "csv" and no table, rows are returned only in the "csv" field.
     Returns:
         Dict with result rows and metadata.
     Errors:
@@ -354,6 +394,7 @@ async def ask_db(
         mode: "execute" (default) or "preview"/"explain" behavior.
         preview_limit: Row cap for preview mode.
         output_format: Output format (e.g., "json", "csv", "table").
+            With "csv" and no table, rows are returned only in the "csv" field.
     Returns:
         Dict with SQL, recommended SQL, plan metadata, and optional results.
     """
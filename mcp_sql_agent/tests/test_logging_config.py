@@ -0,0 +1,29 @@
+import json
+import logging
+
+from mcp_sql_agent.app.infrastructure import logging_config
+
+
+def test_json_formatter_timestamp_matches_isoformat():
+    formatter = logging_config.JsonFormatter()
+    record = logging.LogRecord("x", logging.INFO, "p", 1, "msg", None, None)
+    record.created = 1700000000.25
+
+    payload = json.loads(formatter.format(record))
+    assert payload["ts"] == "2023-11-14T22:13:20.250000+00:00"
+    assert payload["message"] == "msg"
+
+
+def test_configure_logging_writes_json_through_listener(capsysbinary):
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers, root.level
+    try:
+        logging_config.configure_logging("INFO")
+        logging.getLogger("t").info("hello %s", "world")
+        logging_config._stop_listener()
+    finally:
+        root.handlers, root.level = saved_handlers, saved_level
+
+    payload = json.loads(capsysbinary.readouterr().err.decode().strip())
+    assert payload["message"] == "hello world"
+    assert payload["logger"] == "t"
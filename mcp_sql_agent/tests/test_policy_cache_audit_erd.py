@@ -1,7 +1,12 @@
+import asyncio
 import json
+from datetime import date
+from decimal import Decimal
 
 from mcp_sql_agent.app.application import audit_log
 from mcp_sql_agent.app.application import erd_rendering
+from mcp_sql_agent.app.application import persistent_cache
+from mcp_sql_agent.app.application import plan_cache
 from mcp_sql_agent.app.application import query_cache
 from mcp_sql_agent.app.application import safety_policy
 
@@ -9,7 +14,7 @@ from mcp_sql_agent.app.application import safety_policy
 def test_query_cache_expires(monkeypatch):
     cache = query_cache.QueryCache(ttl_seconds=5)
     now = [100.0]
-    monkeypatch.setattr(query_cache.time, "time", lambda: now[0])
+    monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
 
     cache.set("k", "v")
     assert cache.get("k") == "v"
@@ -18,6 +23,46 @@ def test_query_cache_expires(monkeypatch):
     assert cache.get("k") is None
 
 
+def test_query_cache_evicts_least_recently_used():
+    cache = query_cache.QueryCache(maxsize=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_query_cache_drops_entries_when_schema_changes():
+    cache = query_cache.QueryCache()
+    cache.invalidate_schema("db", "fp1")
+    cache.set("a", "1", "fp1")
+    cache.set("other", "2", "fp9")
+
+    assert cache.invalidate_schema("db", "fp1") == 0
+    assert cache.invalidate_schema("db", "fp2") == 1
+    assert cache.get("a") is None
+    assert cache.get("other", "fp9") == "2"
+
+
+def test_query_cache_warms_from_persistent_store(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    cache = query_cache.QueryCache(disk=persistent_cache.PersistentStore(path))
+    cache.invalidate_schema("db", "fp1")
+    cache.set("a", "select 1", "fp1")
+    cache.set("b", "select 2", "fp2")
+
+    warm = query_cache.QueryCache(disk=persistent_cache.PersistentStore(path))
+    assert warm.get("a", "fp1") == "select 1"
+
+    cache.invalidate_schema("db", "fp9")
+    cold = query_cache.QueryCache(disk=persistent_cache.PersistentStore(path))
+    assert cold.get("a") is None
+    assert cold.get("b", "fp2") == "select 2"
+
+
 def test_build_cache_key_stable_for_schema_order():
     schema_a = {"tables": {"users": [{"name": "id"}]}, "foreign_keys": []}
     schema_b = {"foreign_keys": [], "tables": {"users": [{"name": "id"}]}}
@@ -27,17 +72,47 @@ def test_build_cache_key_stable_for_schema_order():
     assert key_a == key_b
 
 
+def test_sql_template_reuses_translation_for_new_literals():
+    template_nl, literals = query_cache.normalize_nl_literals("top 5 users named 'Alice'")
+    assert template_nl == "top ? users named '?'"
+
+    template = query_cache.to_sql_template(
+        "SELECT * FROM users WHERE name = 'Alice' LIMIT 5", literals
+    )
+    _, new_literals = query_cache.normalize_nl_literals("top 10 users named 'Bob'")
+    sql = query_cache.render_sql_template(template, new_literals)
+    assert sql == "SELECT * FROM users WHERE name = 'Bob' LIMIT 10"
+
+
+def test_sql_template_rejects_ambiguous_literals():
+    _, literals = query_cache.normalize_nl_literals("users with id 1")
+    assert query_cache.to_sql_template("SELECT * FROM t WHERE id = 1 LIMIT 1", literals) is None
+
+
 def test_write_event_uses_env_path(tmp_path, monkeypatch):
     log_path = tmp_path / "audit.jsonl"
     monkeypatch.setenv("AUDIT_LOG_PATH", str(log_path))
 
     audit_log.write_event({"event": "ok"})
+    assert audit_log.flush() is True
 
     payload = json.loads(log_path.read_text(encoding="utf-8").strip())
     assert payload["event"] == "ok"
     assert "ts" in payload
 
 
+def test_write_event_serializes_non_json_values(tmp_path, monkeypatch):
+    log_path = tmp_path / "audit.jsonl"
+    monkeypatch.setenv("AUDIT_LOG_PATH", str(log_path))
+
+    audit_log.write_event({"event": "ok", "cost": Decimal("1.50"), "day": date(2024, 1, 2)})
+    assert audit_log.flush() is True
+
+    payload = json.loads(log_path.read_text(encoding="utf-8").strip())
+    assert payload["cost"] == "1.50"
+    assert payload["day"] == "2024-01-02"
+
+
 def test_build_erd_mermaid_sanitizes_schema():
     schema = {
         "tables": {
@@ -104,3 +179,43 @@ def test_evaluate_policy_blocks_high_risk():
     )
     assert res["allowed"] is False
     assert res["policy"] == "RISK_THRESHOLD"
+
+
+def test_plan_cache_single_flight_shares_one_build():
+    cache = plan_cache.PlanCache()
+    builds = []
+
+    async def _build():
+        builds.append(1)
+        await asyncio.sleep(0)
+        return {"safe_sql": "select 1"}
+
+    async def _run():
+        return await asyncio.gather(
+            *(cache.single_flight("k", _build) for _ in range(3))
+        )
+
+    results = asyncio.run(_run())
+    assert builds == [1]
+    assert results == [{"safe_sql": "select 1"}] * 3
+
+
+def test_write_event_drops_when_backlog_full(monkeypatch):
+    monkeypatch.setattr(audit_log, "_q", audit_log.queue.Queue(maxsize=1))
+    monkeypatch.setattr(audit_log, "_ensure_writer", lambda: None)
+    before = audit_log.dropped_events()
+
+    audit_log.write_event({"event": "kept"})
+    audit_log.write_event({"event": "dropped"})
+
+    assert audit_log.dropped_events() == before + 1
+
+
+def test_flush_times_out_when_backlog_full(monkeypatch):
+    full = audit_log.queue.Queue(maxsize=1)
+    full.put(b"stuck\n")
+    monkeypatch.setattr(audit_log, "_q", full)
+    # A writer that never drains the queue.
+    monkeypatch.setattr(audit_log, "_writer_thread", object())
+
+    assert audit_log.flush(timeout=0.01) is False
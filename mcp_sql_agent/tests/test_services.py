@@ -1,15 +1,29 @@
 import asyncio
+import dataclasses
+import os
 from pathlib import Path
 
+import pytest
+
+from mcp_sql_agent.app.application import plan_cache
+from mcp_sql_agent.app.application.dto import QueryPlanDto
+from mcp_sql_agent.app.application.schema_pruning import prune_schema
 from mcp_sql_agent.app.application.sql_agent_service import SqlAgentService
+from mcp_sql_agent.app.application.use_cases import run_sql, translate
+from mcp_sql_agent.app.infrastructure.db import sqlalchemy_adapter
 from mcp_sql_agent.app.infrastructure.db.sqlalchemy_adapter import SQLAlchemyAdapter
-from mcp_sql_agent.app.infrastructure import db_context
-from mcp_sql_agent.app.application.sql_formatting import format_table
-from mcp_sql_agent.app.application.sql_planning import build_query_plan
+from mcp_sql_agent.app.infrastructure import config, db_context
+from mcp_sql_agent.app.application.sql_formatting import format_table, format_table_rows
+from mcp_sql_agent.app.application import sql_planning
+from mcp_sql_agent.app.application.sql_planning import (
+    _build_plan_json,
+    build_query_plan,
+)
 from mcp_sql_agent.app.application.sql_validation import (
     apply_limit,
     has_limit,
     validate_sql_select,
+    validate_sql_write,
 )
 
 
@@ -44,6 +58,20 @@ def test_validate_sql_select_allows_with_cte():
     assert err == ""
 
 
+def test_validate_sql_select_blocks_keyword_not_space_delimited():
+    ok, err = validate_sql_select("WITH x AS (DELETE FROM t RETURNING *) SELECT * FROM x")
+    assert ok is False
+    assert err == "Blocked keyword: delete."
+
+
+def test_validate_sql_ignores_keywords_in_quoted_values():
+    assert validate_sql_select("SELECT * FROM orders WHERE status = 'delete'") == (True, "")
+    assert validate_sql_select('SELECT "create" FROM events') == (True, "")
+    assert validate_sql_write("INSERT INTO log(action) VALUES ('drop')") == (True, "")
+    ok, err = validate_sql_select("WITH x AS (DELETE FROM t RETURNING 'a') SELECT * FROM x")
+    assert (ok, err) == (False, "Blocked keyword: delete.")
+
+
 def test_has_limit_detects_limit_any_case():
     assert has_limit("select * from t limit 1") is True
     assert has_limit("select * from t LiMiT 1") is True
@@ -64,6 +92,15 @@ def test_format_table_grid_has_borders():
     assert "Alice" in table
 
 
+def test_format_table_rows_matches_dict_rows():
+    rows = [{"id": 1, "name": "Alice"}, {"id": 2, "name": None}]
+    tuples = [(1, "Alice"), (2, None)]
+    for style in ("simple", "grid"):
+        assert format_table_rows(["id", "name"], tuples, style) == format_table(
+            rows, style=style
+        )
+
+
 def test_build_query_plan_sqlite(tmp_path):
     adapter = _make_sqlite_adapter(tmp_path)
     plan = asyncio.run(
@@ -72,6 +109,33 @@ def test_build_query_plan_sqlite(tmp_path):
     assert "explain" in plan
     assert "safe_sql" in plan
     assert plan["safe_sql"].endswith("LIMIT 5")
+    assert "SELECT * can fetch unnecessary columns." in plan["risky_reasons"]
+
+
+def test_build_query_plan_can_skip_explain(tmp_path):
+    adapter = _make_sqlite_adapter(tmp_path)
+    plan = asyncio.run(
+        build_query_plan("SELECT * FROM orders", adapter, safe_limit=5, run_explain=False)
+    )
+    assert plan["explain"] == {"dialect": "sqlite", "skipped": True}
+    assert plan["safe_sql"].endswith("LIMIT 5")
+    assert any("EXPLAIN skipped" in note for note in plan["notes"])
+
+
+def test_build_plan_json_extracts_clauses():
+    sql = (
+        "SELECT o.id, count(*) FROM orders o\n"
+        "JOIN users u ON u.id = o.user_id\n"
+        "WHERE o.total > 10\nGROUP BY o.id ORDER BY o.id LIMIT 3"
+    )
+    plan = _build_plan_json(sql)
+    assert plan["tables"] == ["orders", "users"]
+    assert plan["joins"] == ["users"]
+    assert plan["filters"] == ["o.total > 10"]
+    assert plan["group_by"] == ["o.id"]
+    assert plan["order_by"] == ["o.id"]
+    assert plan["limit"] == 3
+    assert plan["confidence"] == 1.0
 
 
 def test_translate_uses_schema(monkeypatch, tmp_path):
@@ -85,3 +149,450 @@ def test_translate_uses_schema(monkeypatch, tmp_path):
     assert translator.calls[0][0] == "all orders"
     assert "orders" in translator.calls[0][1]
     assert translator.calls[0][2] == "sqlite"
+
+
+def test_schema_cache_refreshes_after_ddl(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'test.db'}"
+    context = db_context.DbContext(db_url)
+    context._schema_probe_interval_seconds = 0
+
+    async def _run():
+        await context.get_adapter().execute_write("CREATE TABLE a (id INTEGER)")
+        first = await context.get_schema()
+        again = await context.get_schema()
+        await context.get_adapter().execute_write("CREATE TABLE b (id INTEGER)")
+        after = await context.get_schema()
+        await context.get_adapter().engine.dispose()
+        return first, again, after
+
+    first, again, after = asyncio.run(_run())
+    assert again is first
+    assert set(after["tables"]) == {"a", "b"}
+
+
+def test_schema_cache_skips_probe_within_interval(monkeypatch, tmp_path):
+    context = db_context.DbContext(f"sqlite:///{tmp_path / 'test.db'}")
+    adapter = context.get_adapter()
+    probes = []
+    probe = adapter.get_schema_version
+
+    async def _counting_probe():
+        probes.append(1)
+        return await probe()
+
+    monkeypatch.setattr(adapter, "get_schema_version", _counting_probe)
+
+    async def _run():
+        await adapter.execute_write("CREATE TABLE a (id INTEGER)")
+        first = await context.get_schema()
+        again = await context.get_schema()
+        context._schema_probe_interval_seconds = 0
+        probed = await context.get_schema()
+        await adapter.engine.dispose()
+        return first, again, probed
+
+    first, again, probed = asyncio.run(_run())
+    assert again is first and probed is first
+    assert len(probes) == 2
+
+
+def test_schema_cache_refreshes_in_background_near_expiry(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'test.db'}"
+    context = db_context.DbContext(db_url)
+
+    async def _run():
+        await context.get_adapter().execute_write("CREATE TABLE a (id INTEGER)")
+        first = await context.get_schema()
+        schema, _, version, probed_at = context._schema_cache[db_url]
+        context._schema_cache[db_url] = (
+            schema, db_context.time.monotonic() + 1, version, probed_at
+        )
+        stale = await context.get_schema()
+        await asyncio.gather(*context._refresh_tasks.values())
+        fresh = await context.get_schema()
+        await context.get_adapter().engine.dispose()
+        return first, stale, fresh
+
+    first, stale, fresh = asyncio.run(_run())
+    assert stale is first
+    assert fresh is not first
+    assert fresh == first
+
+
+def test_set_db_url_cancels_refreshes_and_peek_drops_expired(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'test.db'}"
+    context = db_context.DbContext(db_url)
+
+    async def _run():
+        await context.get_adapter().execute_write("CREATE TABLE a (id INTEGER)")
+        await context.get_schema()
+        schema, _, version, probed_at = context._schema_cache[db_url]
+        context._schema_cache[db_url] = (schema, 0.0, version, probed_at)
+        assert context.peek_schema() is None
+        assert db_url not in context._schema_cache
+        refresh = context._refresh_tasks[db_url]
+        await context.set_db_url(f"sqlite:///{tmp_path / 'other.db'}")
+        assert refresh in context._background_tasks
+        await asyncio.gather(refresh, return_exceptions=True)
+        await context.get_adapter().engine.dispose()
+        return refresh
+
+    refresh = asyncio.run(_run())
+    assert refresh.cancelled()
+    assert context._schema_cache == {}
+
+
+def test_get_schema_reads_columns_and_foreign_keys(tmp_path):
+    adapter = SQLAlchemyAdapter(f"sqlite:///{tmp_path / 'test.db'}")
+
+    async def _run():
+        await adapter.execute_write("CREATE TABLE users (id INTEGER PRIMARY KEY)")
+        await adapter.execute_write(
+            "CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users)"
+        )
+        schema = await adapter.get_schema()
+        await adapter.engine.dispose()
+        return schema
+
+    schema = asyncio.run(_run())
+    assert schema["tables"]["orders"] == [
+        {"name": "id", "type": "INTEGER"},
+        {"name": "user_id", "type": "INTEGER"},
+    ]
+    assert schema["foreign_keys"] == [
+        {
+            "table": "orders",
+            "columns": ["user_id"],
+            "referred_table": "users",
+            "referred_columns": ["id"],
+        }
+    ]
+
+
+class _PostgresCatalogConnection:
+    """Sync connection stub answering the PostgreSQL catalog queries."""
+    def __init__(self, rows_by_sql: dict):
+        self._rows_by_sql = rows_by_sql
+
+    def exec_driver_sql(self, sql):
+        return iter(self._rows_by_sql[sql])
+
+
+def test_get_schema_keeps_postgres_type_modifiers():
+    columns_sql = sqlalchemy_adapter._SCHEMA_COLUMNS_SQL["postgresql"]
+    fks_sql = sqlalchemy_adapter._SCHEMA_FOREIGN_KEYS_SQL["postgresql"]
+    # Rows as format_type(atttypid, atttypmod) renders them.
+    conn = _PostgresCatalogConnection(
+        {
+            columns_sql: [
+                ("orders", "id", "integer"),
+                ("orders", "code", "character varying(20)"),
+                ("orders", "total", "numeric(10,2)"),
+                ("orders", "tags", "text[]"),
+                ("orders", "placed_at", "timestamp(3) with time zone"),
+            ],
+            fks_sql: [],
+        }
+    )
+
+    schema = sqlalchemy_adapter._query_schema(conn, columns_sql, fks_sql)
+    assert "format_type(a.atttypid, a.atttypmod)" in columns_sql
+    assert [col["type"] for col in schema["tables"]["orders"]] == [
+        "integer",
+        "character varying(20)",
+        "numeric(10,2)",
+        "text[]",
+        "timestamp(3) with time zone",
+    ]
+
+
+def test_run_sql_reuses_cached_plan(monkeypatch, tmp_path):
+    adapter = _make_sqlite_adapter(tmp_path)
+    context = db_context.DbContext(f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(context, "_adapter", adapter)
+    calls = []
+
+    async def _counting_plan(sql, adapter, **kwargs):
+        calls.append(sql)
+        return await build_query_plan(sql, adapter, **kwargs)
+
+    monkeypatch.setattr(plan_cache, "build_query_plan", _counting_plan)
+    use_case = run_sql.RunSqlUseCase(context)
+
+    async def _run():
+        await context.get_schema()
+        first = await use_case.execute("SELECT id FROM orders")
+        second = await use_case.execute("SELECT id FROM orders")
+        await use_case.execute("SELECT id FROM orders", safe_limit=5)
+        return first, second
+
+    first, second = asyncio.run(_run())
+    assert second["rows"] == first["rows"]
+    assert calls == ["SELECT id FROM orders", "SELECT id FROM orders"]
+
+
+def test_plan_query_and_ask_db_share_cached_plan(monkeypatch, tmp_path):
+    adapter = _make_sqlite_adapter(tmp_path)
+    context = db_context.DbContext(f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(context, "_adapter", adapter)
+    service = SqlAgentService(context, lambda: _FakeTranslator())
+    calls = []
+
+    async def _counting_plan(sql, adapter, **kwargs):
+        calls.append(sql)
+        return await build_query_plan(sql, adapter, **kwargs)
+
+    monkeypatch.setattr(plan_cache, "build_query_plan", _counting_plan)
+
+    async def _run():
+        planned = await service.plan_query("all orders")
+        asked = await service.ask_db("all orders")
+        return planned, asked
+
+    planned, asked = asyncio.run(_run())
+    assert asked["plan"] is planned["plan"]
+    assert len(calls) == 1
+
+
+def test_run_sql_reuses_explain_across_literals(monkeypatch, tmp_path):
+    adapter = _make_sqlite_adapter(tmp_path)
+    context = db_context.DbContext(f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(context, "_adapter", adapter)
+    explained = []
+    run_explain = sql_planning._run_explain
+
+    async def _counting_explain(sql, adapter):
+        explained.append(sql)
+        return await run_explain(sql, adapter)
+
+    monkeypatch.setattr(sql_planning, "_run_explain", _counting_explain)
+    use_case = run_sql.RunSqlUseCase(context)
+
+    async def _run():
+        await context.get_schema()
+        await use_case.execute("SELECT id FROM orders WHERE id = 1")
+        return await use_case.execute("SELECT id FROM orders WHERE id = 2")
+
+    res = asyncio.run(_run())
+    assert res["rows"] == [{"id": 2}]
+    assert res["plan"]["safe_sql"].startswith("SELECT id FROM orders WHERE id = 2")
+    assert explained == ["SELECT id FROM orders WHERE id = 1"]
+
+
+def test_run_sql_does_not_probe_schema_per_call(monkeypatch, tmp_path):
+    adapter = _make_sqlite_adapter(tmp_path)
+    context = db_context.DbContext(f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(context, "_adapter", adapter)
+    use_case = run_sql.RunSqlUseCase(context)
+    probes = []
+    probe = adapter.get_schema_version
+
+    async def _counting_probe():
+        probes.append(1)
+        return await probe()
+
+    async def _run():
+        await context.get_schema()
+        monkeypatch.setattr(adapter, "get_schema_version", _counting_probe)
+        await use_case.execute("SELECT id FROM orders")
+        return await use_case.execute("SELECT id FROM orders")
+
+    res = asyncio.run(_run())
+    assert res["rows"] == [{"id": 1}, {"id": 2}]
+    assert probes == []
+
+
+def test_cached_query_plan_does_not_cache_failed_explain(monkeypatch, tmp_path):
+    adapter = _make_sqlite_adapter(tmp_path)
+    query = adapter.query
+    failures = [RuntimeError("database is locked")]
+
+    async def _flaky_query(sql):
+        if failures:
+            raise failures.pop()
+        return await query(sql)
+
+    monkeypatch.setattr(adapter, "query", _flaky_query)
+    cache = plan_cache.PlanCache()
+    schema = asyncio.run(adapter.get_schema())
+
+    async def _plan():
+        return await plan_cache.cached_query_plan(
+            cache, "SELECT id FROM orders", adapter, None, schema, 100
+        )
+
+    failed = asyncio.run(_plan())
+    retried = asyncio.run(_plan())
+    assert "error" in failed["explain"]
+    assert "rows" in retried["explain"]
+    assert asyncio.run(_plan()) is retried
+
+
+def test_translate_reuses_cached_schema_and_translation(monkeypatch, tmp_path):
+    adapter = _make_sqlite_adapter(tmp_path)
+    context = db_context.DbContext(f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(context, "_adapter", adapter)
+    translator = _FakeTranslator()
+    service = SqlAgentService(context, lambda: translator)
+
+    async def _run():
+        await service.translate("all orders")
+        return await service._translate_use_case.execute_with_meta("all orders")
+
+    meta = asyncio.run(_run())
+    assert meta["cache_hit"] is True
+    assert len(translator.calls) == 1
+
+
+class _MappedTranslator:
+    def __init__(self, sql_by_request: dict):
+        self.sql_by_request = sql_by_request
+        self.calls = []
+
+    async def translate(self, nl_query: str, schema: dict, dialect: str) -> str:
+        self.calls.append(nl_query)
+        return self.sql_by_request[nl_query]
+
+
+def test_translate_cache_templates_literals_and_falls_back_to_exact_key(
+    monkeypatch, tmp_path
+):
+    adapter = _make_sqlite_adapter(tmp_path)
+    context = db_context.DbContext(f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(context, "_adapter", adapter)
+    translator = _MappedTranslator(
+        {
+            "top 5 orders for user 10": "SELECT * FROM orders WHERE user_id = 10 LIMIT 5",
+            "orders with id 1": "SELECT * FROM orders WHERE id = 1 LIMIT 1",
+            "orders with id 2": "SELECT * FROM orders WHERE id = 2 LIMIT 1",
+            "orders ? user 10": "SELECT * FROM orders WHERE user_id = 10",
+            "orders 3 user 10": "SELECT * FROM orders WHERE id = 3 AND user_id = 10",
+        }
+    )
+    use_case = translate.TranslateUseCase(context, lambda: translator)
+
+    async def _run(nl_query):
+        return await use_case.execute_with_meta(nl_query)
+
+    asyncio.run(_run("top 5 orders for user 10"))
+    templated = asyncio.run(_run("top 2 orders for user 11"))
+    assert templated["cache_hit"] is True
+    assert templated["sql"] == "SELECT * FROM orders WHERE user_id = 11 LIMIT 2"
+
+    # "1" appears twice in the SQL, so the translation is cached by exact text.
+    asyncio.run(_run("orders with id 1"))
+    assert asyncio.run(_run("orders with id 1"))["cache_hit"] is True
+    assert asyncio.run(_run("orders with id 2"))["cache_hit"] is False
+
+    # Same NL template, but one literal instead of two: not the same request.
+    asyncio.run(_run("orders ? user 10"))
+    other_shape = asyncio.run(_run("orders 3 user 10"))
+    assert other_shape["cache_hit"] is False
+    assert other_shape["sql"] == "SELECT * FROM orders WHERE id = 3 AND user_id = 10"
+
+    assert translator.calls == [
+        "top 5 orders for user 10",
+        "orders with id 1",
+        "orders with id 2",
+        "orders ? user 10",
+        "orders 3 user 10",
+    ]
+
+
+class _RecordingEngine:
+    def __init__(self, disposed: list):
+        self._disposed = disposed
+
+    async def dispose(self):
+        self._disposed.append(self)
+
+
+def test_db_context_aclose_disposes_every_pool(monkeypatch, tmp_path):
+    context = db_context.DbContext(f"sqlite:///{tmp_path / 'default.db'}")
+    disposed = []
+    engines = []
+    for url in (None, f"sqlite:///{tmp_path / 'a.db'}"):
+        engine = _RecordingEngine(disposed)
+        monkeypatch.setattr(context.get_adapter(url), "engine", engine)
+        engines.append(engine)
+
+    asyncio.run(context.aclose())
+    assert disposed == engines
+
+
+def test_get_adapter_reuses_adapter_per_override_url(tmp_path):
+    context = db_context.DbContext(f"sqlite:///{tmp_path / 'default.db'}")
+    context._max_adapters = 2
+    url_a = f"sqlite:///{tmp_path / 'a.db'}"
+
+    adapter_a = context.get_adapter(url_a)
+    assert context.get_adapter(url_a) is adapter_a
+    assert context.get_adapter(context.db_url) is context.get_adapter()
+
+    context.get_adapter(f"sqlite:///{tmp_path / 'b.db'}")
+    context.get_adapter(f"sqlite:///{tmp_path / 'c.db'}")
+    assert context.get_adapter(url_a) is not adapter_a
+
+    adapter_a = context.get_adapter(url_a)
+    asyncio.run(context.set_db_url(url_a))
+    assert context.get_adapter() is adapter_a
+
+
+def test_prune_schema_keeps_matching_tables_and_fk_neighbours():
+    tables = {f"t{i}": [{"name": "id", "type": "INTEGER"}] for i in range(30)}
+    tables["orders"] = [{"name": "user_id", "type": "INTEGER"}]
+    tables["users"] = [{"name": "id", "type": "INTEGER"}]
+    schema = {
+        "tables": tables,
+        "foreign_keys": [
+            {"table": "orders", "columns": ["user_id"], "referred_table": "users"}
+        ],
+    }
+
+    assert list(prune_schema("total of all orders", schema)) == ["orders", "users"]
+    assert prune_schema("something unrelated", schema) is tables
+
+
+def test_load_env_parses_assignments_without_overriding(tmp_path, monkeypatch):
+    env_path = tmp_path / ".env"
+    env_path.write_text(
+        "# comment\nQF_A = \"two words\"  \nQF_B='x#y'\nnot an assignment\nQF_C=a=b\r\n",
+        encoding="utf-8",
+    )
+    for key in ("QF_A", "QF_B", "QF_C"):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("QF_C", "kept")
+
+    config.load_env(env_path)
+    assert os.environ["QF_A"] == "two words"
+    assert os.environ["QF_B"] == "x#y"
+    assert os.environ["QF_C"] == "kept"
+
+
+def _plan_dict() -> dict:
+    return {
+        "explain": {"dialect": "sqlite", "rows": []},
+        "risk_score": 0.1,
+        "risky_reasons": ["SELECT * can fetch unnecessary columns."],
+        "improvements": [],
+        "plan_json": {"tables": ["users"]},
+        "safe_sql": "SELECT * FROM users LIMIT 10",
+        "notes": [],
+    }
+
+
+def test_query_plan_dto_is_frozen():
+    dto = QueryPlanDto.from_dict(_plan_dict())
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        dto.safe_sql = "DELETE FROM users"
+
+
+def test_query_plan_dto_does_not_share_plan_lists():
+    plan = _plan_dict()
+    dto = QueryPlanDto.from_trusted_dict(plan)
+
+    dto.to_dict()["risky_reasons"].append("mutated")
+    plan["notes"].append("late note")
+
+    assert plan["risky_reasons"] == ["SELECT * can fetch unnecessary columns."]
+    assert dto.notes == ()
@@ -1,4 +1,6 @@
 import asyncio
+import subprocess
+import sys
 from pathlib import Path
 
 from mcp_sql_agent.app.application.sql_agent_service import SqlAgentService  # noqa: E402
@@ -77,6 +79,27 @@ def test_run_sql_executes_select_on_sqlite(tmp_path, monkeypatch):
     assert res["rows"] == [{"name": "Alice"}, {"name": "Bob"}]
 
 
+def test_run_sql_unsafe_skips_policy(tmp_path, monkeypatch):
+    adapter = _make_sqlite_adapter(tmp_path)
+    _set_test_service(tmp_path, monkeypatch, adapter)
+
+    res = asyncio.run(sql_tools.run_sql("SELECT name FROM users", safe=False))
+    assert res["row_count"] == 2
+    assert res["policy"]["policy"] == "BYPASSED"
+
+
+def test_run_sql_csv_output_streams_driver_rows(tmp_path, monkeypatch):
+    adapter = _make_sqlite_adapter(tmp_path)
+    _set_test_service(tmp_path, monkeypatch, adapter)
+
+    res = asyncio.run(
+        sql_tools.run_sql("SELECT id, name FROM users ORDER BY id", output_format="csv")
+    )
+    assert res["row_count"] == 2
+    assert res["rows"] == []
+    assert res["csv"] == "id,name\n1,Alice\n2,Bob"
+
+
 def test_run_sql_write_updates_rows(tmp_path):
     adapter = _make_sqlite_adapter(tmp_path)
     db_url = f"sqlite:///{tmp_path / 'test.db'}"
@@ -103,3 +126,65 @@ def test_run_sql_write_blocks_select():
     )
     res = asyncio.run(sql_tools.run_sql_write("SELECT * FROM users"))
     assert "error" in res
+
+
+def test_lifespan_warms_schema_cache(tmp_path, monkeypatch):
+    _make_sqlite_adapter(tmp_path)
+    _set_test_service(tmp_path, monkeypatch)
+    context = sql_tools._get_service()._adapter_provider
+
+    async def _run():
+        async with sql_tools._lifespan(sql_tools.mcp):
+            for _ in range(200):
+                if context._schema_cache:
+                    break
+                await asyncio.sleep(0.01)
+            cached = dict(context._schema_cache)
+        await context.get_adapter().engine.dispose()
+        return cached
+
+    cached = asyncio.run(_run())
+    assert set(cached[context.db_url][0]["tables"]) == {"users"}
+
+
+def test_lifespan_stops_warm_up_and_closes_pools(tmp_path, monkeypatch):
+    _set_test_service(tmp_path, monkeypatch)
+    context = sql_tools._get_service()._adapter_provider
+    warm_ups = []
+    closed = []
+
+    async def _hanging_schema(db_url=None):
+        warm_ups.append(asyncio.current_task())
+        await asyncio.Event().wait()
+
+    async def _aclose():
+        closed.append(warm_ups[0].done())
+
+    monkeypatch.setattr(context, "get_schema", _hanging_schema)
+    monkeypatch.setattr(context, "aclose", _aclose)
+
+    async def _run():
+        async with sql_tools._lifespan(sql_tools.mcp):
+            await asyncio.sleep(0)
+
+    asyncio.run(_run())
+    assert warm_ups[0].cancelled()
+    assert closed == [True]
+
+
+def test_building_service_defers_use_case_imports():
+    # A fresh interpreter, since this test session has already loaded them all.
+    code = (
+        "import sys\n"
+        "from mcp_sql_agent.app.interfaces.mcp.tools import sql_tools\n"
+        "sql_tools.build_sql_agent_service()\n"
+        "print(sorted(m for m in sys.modules if m.startswith("
+        "('mcp_sql_agent.app.application.use_cases.',"
+        " 'mcp_sql_agent.app.application.plan_cache',"
+        " 'mcp_sql_agent.app.application.sql_planning'))))\n"
+    )
+    root = Path(__file__).resolve().parents[2]
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "[]"
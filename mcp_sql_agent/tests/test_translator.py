@@ -0,0 +1,24 @@
+import asyncio
+
+from mcp_sql_agent.app.infrastructure.llm import translator
+
+
+def test_rate_limiter_waits_for_refill(monkeypatch):
+    now = [0.0]
+    sleeps = []
+
+    async def _sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(translator.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(translator.asyncio, "sleep", _sleep)
+
+    async def _run():
+        limiter = translator._RateLimiter(60)
+        await limiter.acquire(60)
+        await limiter.acquire(2)
+        await limiter.acquire(100)
+
+    asyncio.run(_run())
+    assert sleeps == [2.0, 60.0]